@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Simulates device allocation policies by replaying a trace of attach and detach requests.
+
+A trace is a file with a JSON object per line, e.g.:
+
+    {"op": "attach", "eid": "1", "gpus": 1, "gpu_memory": "10g"}
+    {"op": "detach", "eid": "1"}
+
+A random trace is generated if no trace is given.
+
+Usage: python devel/benchmarks/allocation.py [--trace PATH] [--record PATH]
+"""
+
+import argparse
+import json
+import random
+from typing import Dict, Iterable, List
+
+from genv.entities import Device, Devices
+from genv.entities.core import allocation
+from genv.utils import Memory
+
+
+def generate(args: argparse.Namespace) -> List[Dict]:
+    """Generates a random trace of environments that attach and later detach."""
+    rng = random.Random(args.seed)
+    trace = []
+    running = []
+
+    for i in range(args.events):
+        if running and (rng.random() < 0.5 or len(running) > 6 * args.devices):
+            eid = running.pop(rng.randrange(len(running)))
+            trace.append(dict(op="detach", eid=eid))
+        else:
+            eid = str(i)
+            running.append(eid)
+            trace.append(
+                dict(
+                    op="attach",
+                    eid=eid,
+                    gpus=rng.choices([1, 2], weights=[9, 1])[0],
+                    gpu_memory=rng.choices(["4g", "10g", "20g", "40g"], [4, 3, 2, 1])[
+                        0
+                    ],
+                )
+            )
+
+    return trace
+
+
+def simulate(trace: Iterable[Dict], args: argparse.Namespace, policy: str) -> Dict:
+    """Replays a trace with the given policy and returns statistics."""
+    devices = Devices(
+        [Device(index, args.total_memory, []) for index in range(args.devices)]
+    )
+
+    total = args.devices * Memory(args.total_memory).bytes
+    attaches = 0
+    failures = 0
+    failed_bytes = 0
+    utilization = 0.0
+    largest_free = 0.0
+
+    for event in trace:
+        if event["op"] == "attach":
+            attaches += 1
+
+            try:
+                indices = devices.find_available_devices(
+                    event["gpus"], event["gpu_memory"], False, policy
+                )
+            except RuntimeError:
+                failures += 1
+                failed_bytes += event["gpus"] * Memory(event["gpu_memory"]).bytes
+                continue
+
+            devices.attach(event["eid"], indices, event["gpu_memory"])
+        else:
+            devices.detach(event["eid"])
+
+        available = [device.available_memory_bytes for device in devices]
+        utilization += 1 - sum(available) / total
+        largest_free += max(available) / Memory(args.total_memory).bytes
+
+    events = max(len(trace), 1)
+
+    return dict(
+        attaches=attaches,
+        failures=failures,
+        failed_memory=Memory(failed_bytes).to("g"),
+        utilization=f"{100 * utilization / events:.1f}%",
+        largest_free=f"{100 * largest_free / events:.1f}%",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trace", help="Trace to replay")
+    parser.add_argument("--record", help="Save the generated trace to this path")
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--total-memory", default="80g")
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.trace:
+        with open(args.trace) as f:
+            trace = [json.loads(line) for line in f if line.strip()]
+    else:
+        trace = generate(args)
+
+        if args.record:
+            with open(args.record, "w") as f:
+                f.writelines(f"{json.dumps(event)}\n" for event in trace)
+
+    print(
+        f"{'POLICY':<12}{'ATTACHES':<10}{'FAILURES':<10}{'FAILED MEMORY':<15}{'UTILIZATION':<13}LARGEST FREE"
+    )
+
+    for policy in allocation.names():
+        stats = simulate(trace, args, policy)
+
+        print(
+            f"{policy:<12}{stats['attaches']:<10}{stats['failures']:<10}{stats['failed_memory']:<15}{stats['utilization']:<13}{stats['largest_free']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
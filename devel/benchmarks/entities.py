@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks lookups in entity collections.
+
+Usage: python devel/benchmarks/entities.py [--count COUNT]
+"""
+
+import argparse
+import time
+
+from genv.entities import Device, Devices, Env, Envs, Process, Processes, Snapshot
+from genv.entities.enforce import Survey
+from genv.enforce.rules import env_memory
+
+
+def snapshot(count: int) -> Snapshot:
+    """Returns a snapshot with the given amount of environments and processes."""
+    envs = Envs(
+        [
+            Env(
+                eid=str(i),
+                uid=1000,
+                creation="01/01/2024 00:00:00",
+                username=f"user{i % 100}",
+                config=Env.Config(gpu_memory="1g"),
+                pids=[i],
+                kernel_ids=[],
+            )
+            for i in range(count)
+        ]
+    )
+
+    devices = Devices(
+        [
+            Device(
+                index,
+                "80g",
+                [
+                    Device.Attachement(env.eid, "1g", env.creation)
+                    for env in envs
+                    if int(env.eid) % 8 == index
+                ],
+            )
+            for index in range(8)
+        ]
+    )
+
+    processes = Processes(
+        [
+            Process(
+                pid=i,
+                used_gpu_memory=[Process.Usage(i % 8, "512m")],
+                eid=str(i),
+            )
+            for i in range(count)
+        ]
+    )
+
+    return Snapshot(processes, envs, devices)
+
+
+def measure(name: str, f) -> None:
+    start = time.perf_counter()
+    f()
+    print(f"{name:<32} {time.perf_counter() - start:.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+
+    s = snapshot(args.count)
+    eids = [str(i) for i in range(args.count)]
+    pids = list(range(args.count))
+
+    measure("envs[eid]", lambda: [s.envs[eid] for eid in eids])
+    measure("eid in envs", lambda: [eid in s.envs for eid in eids])
+    measure("processes[pid]", lambda: [s.processes[pid] for pid in pids])
+    measure("envs.find(pid=)", lambda: [s.envs.find(pid=pid) for pid in pids])
+    measure(
+        "processes.filter(eid=)",
+        lambda: [s.processes.filter(eid=eid) for eid in eids],
+    )
+    measure("enforce env_memory", lambda: env_memory(Survey(s)))
+    measure(
+        "snapshot.filter(eid=) devices",
+        lambda: [s.filter(eid=eid).devices for eid in eids],
+    )
+    measure("snapshot.group_by(eid)", lambda: s.group_by("eid"))
+    measure("snapshot.group_by(username)", lambda: s.group_by("username"))
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,7 @@ def get_env(config: dict, name: str, *, check: bool = False) -> Optional[str]:
         raise RuntimeError(f"Cannot find the environment variable '{name}'")
 
 
-def activate_environment(state: dict, eid: str):
+def activate_environment(transaction: genv.core.Transaction, state: dict, eid: str):
     """
     Activates an environment for the container.
     """
@@ -37,10 +37,12 @@ def activate_environment(state: dict, eid: str):
     # 3. make uid optional for environments
     uid = os.getuid()
 
-    genv.core.envs.activate(eid, uid, pid=pid)
+    transaction.activate(eid, uid, pid=pid)
 
 
-def configure_environment(config: dict, eid: str) -> genv.Env.Config:
+def configure_environment(
+    transaction: genv.core.Transaction, config: dict, eid: str
+) -> genv.Env.Config:
     """
     Configures the environment.
     """
@@ -52,19 +54,23 @@ def configure_environment(config: dict, eid: str) -> genv.Env.Config:
         gpus=int(gpus) if gpus else None,
     )
 
-    genv.core.envs.configure(eid, config)
+    transaction.configure(eid, config)
 
     return config
 
 
 def attach_environment(
-    config: dict, eid: str, env_config: genv.Env.Config, allow_over_subscription: bool
+    transaction: genv.core.Transaction,
+    config: dict,
+    eid: str,
+    env_config: genv.Env.Config,
+    allow_over_subscription: bool,
 ) -> Iterable[int]:
     """
     Attaches the environment to devices.
     """
 
-    indices = genv.core.devices.attach(
+    indices = transaction.attach(
         eid,
         gpus=env_config.gpus,
         gpu_memory=env_config.gpu_memory,
@@ -169,9 +175,9 @@ if __name__ == "__main__":
     if not get_env(config, "GENV_ACTIVATE") == "0":
         eid = get_env(config, "GENV_ENVIRONMENT_ID", check=True)
 
-        with genv.utils.global_lock():
-            activate_environment(state, eid)
-            env_config = configure_environment(config, eid)
+        with genv.utils.global_lock(), genv.core.transaction() as transaction:
+            activate_environment(transaction, state, eid)
+            env_config = configure_environment(transaction, config, eid)
 
             if not get_env(config, "GENV_ATTACH") == "0":
                 allow_over_subscription = (
@@ -179,7 +185,7 @@ if __name__ == "__main__":
                 )
 
                 indices = attach_environment(
-                    config, eid, env_config, allow_over_subscription
+                    transaction, config, eid, env_config, allow_over_subscription
                 )
 
     if not get_env(config, "GENV_MOUNT_SHIMS") == "0":
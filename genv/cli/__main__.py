@@ -15,6 +15,7 @@ from . import home
 from . import llm
 from . import lock
 from . import monitor
+from . import reaper
 from . import remote
 from . import shell
 from . import status
@@ -79,6 +80,11 @@ def main():
         ("llm", "Run and attach to LLMs", llm.add_arguments),
         ("lock", "Lock over-subscribed devices", lock.add_arguments),
         ("monitor", "Monitor using Prometheus and Grafana", monitor.add_arguments),
+        (
+            "reaper",
+            "Deactivate environments as soon as their processes exit",
+            reaper.add_arguments,
+        ),
         ("remote", "Query, manage and monitor remote machines", remote.add_arguments),
         ("shell", "Shell support", shell.add_arguments),
         ("status", "Show status of the current environment", status.add_arguments),
@@ -145,6 +151,8 @@ def main():
             lock.run(args)
         elif args.submodule == "monitor":
             asyncio.run(monitor.run(args))
+        elif args.submodule == "reaper":
+            reaper.run(args)
         elif args.submodule == "remote":
             asyncio.run(remote.run(args))
         elif args.submodule == "shell":
@@ -4,6 +4,7 @@ import os
 
 import genv.utils
 from genv.entities import Env
+from genv.entities.core import allocation
 import genv.core
 import genv.sdk
 
@@ -43,6 +44,11 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
         action="store_true",
         help="Use unavailable devices if needed",
     )
+    options.add_argument(
+        "--allocation-policy",
+        choices=allocation.names(),
+        help="Policy for choosing devices (default: $GENV_ALLOCATION_POLICY or first-fit)",
+    )
 
     load = options.add_mutually_exclusive_group()
     load.add_argument(
@@ -63,24 +69,25 @@ def run(shell: int, args: argparse.Namespace) -> None:
 
     eid = args.eid or str(shell)
 
-    with genv.utils.global_lock():
-        genv.core.envs.activate(
+    with genv.utils.global_lock(), genv.core.transaction() as transaction:
+        transaction.activate(
             eid, uid=os.getuid(), username=getpass.getuser(), pid=shell
         )
 
         # NOTE(raz): we currently override the entire configuration if any
         # configuration field was specified
         if args.name or args.gpu_memory or args.gpus:
-            genv.core.envs.configure(
+            transaction.configure(
                 eid, Env.Config(args.name, args.gpu_memory, args.gpus)
             )
 
         if args.gpus and args.attach:
-            genv.core.devices.attach(
+            transaction.attach(
                 eid,
                 gpus=args.gpus,
                 gpu_memory=args.gpu_memory,
                 allow_over_subscription=args.allow_over_subscription,
+                policy=args.allocation_policy,
             )
 
     print(
@@ -1,5 +1,6 @@
 import argparse
 
+from genv.entities.core import allocation
 import genv.sdk
 
 
@@ -34,6 +35,11 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
         action="store_true",
         help="Use unavailable devices if needed",
     )
+    options.add_argument(
+        "--allocation-policy",
+        choices=allocation.names(),
+        help="Policy for choosing devices (default: $GENV_ALLOCATION_POLICY or first-fit)",
+    )
 
 
 def run(args: argparse.Namespace) -> None:
@@ -49,4 +55,5 @@ def run(args: argparse.Namespace) -> None:
             index=args.index,
             gpus=args.count,
             allow_over_subscription=args.allow_over_subscription,
+            policy=args.allocation_policy,
         )
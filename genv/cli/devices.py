@@ -1,15 +1,17 @@
 import argparse
+from contextlib import nullcontext
 import sys
 from typing import Callable, Iterable, Optional
 
 import genv
+from genv.entities.core import allocation
 
 QUERIES = {
     "index": lambda device: device.index,
     "eids": lambda device: " ".join(device.eids),
     "total_memory": lambda device: device.total_memory,
     "attachments": lambda device: " ".join(
-        f"{attachment.eid}+{attachment.gpu_memory or ''}+{attachment.time.replace(' ', '_')}"
+        f"{attachment.eid}+{attachment.gpu_memory or ''}+{str(attachment.time).replace(' ', '_')}"
         for attachment in device.attachments
     ),
 }
@@ -34,7 +36,7 @@ def cleanup(
         pred = lambda _: _ == eid
     else:
         envs = genv.core.envs.snapshot()
-        pred = lambda eid: eid not in envs.eids
+        pred = lambda eid: eid not in envs
 
     for index in sorted(snapshot.indices, reverse=True):
         if count == 0:
@@ -67,6 +69,7 @@ def do_attach(
     count: Optional[int],
     index: Optional[int],
     allow_over_subscription: bool,
+    policy: Optional[str] = None,
 ) -> None:
     """
     Attaches devices to an environment and prints the attached device indices.
@@ -77,6 +80,7 @@ def do_attach(
     :param eid: Environment identifier
     :param count: Amount of devices to attach
     :param index: Device index to attach
+    :param policy: Name of the allocation policy choosing devices by count
     :return: None
     """
     # TODO(raz): merge this method into genv.core.devices.attach() entirely
@@ -106,7 +110,7 @@ def do_attach(
             not_attached_devices = snapshot.filter(not_indices=attached_devices.indices)
 
             indices = not_attached_devices.find_available_devices(
-                count - current, gpu_memory, allow_over_subscription
+                count - current, gpu_memory, allow_over_subscription, policy
             )
 
             snapshot.attach(eid, indices, gpu_memory)
@@ -117,7 +121,7 @@ def do_attach(
         """
         Attach a specific device to the environment.
         """
-        if index not in attached_devices.indices:
+        if index not in attached_devices:
             if not allow_over_subscription and not snapshot[index].available(
                 gpu_memory
             ):
@@ -152,7 +156,7 @@ def do_detach(
     :return: None
     """
     if index is not None:
-        if index in snapshot.indices:
+        if index in snapshot:
             snapshot[index].detach(eid)
     else:
         cleanup(snapshot, eid)
@@ -250,6 +254,11 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
             action="store_true",
             help="Use unavailable devices if needed",
         )
+        parser.add_argument(
+            "--allocation-policy",
+            choices=allocation.names(),
+            help="Policy for choosing devices (default: $GENV_ALLOCATION_POLICY or first-fit)",
+        )
         group = parser.add_mutually_exclusive_group()
         group.add_argument(
             # TODO(raz): remove this argument entirely.
@@ -316,8 +325,16 @@ def run(args: argparse.Namespace) -> None:
     Runs the "genv devices" logic.
     """
 
-    with genv.utils.global_lock():
-        with genv.core.devices.State(args.cleanup, args.reset) as devices:
+    # commands that only read the state do not save it and can run concurrently
+    read_only = args.command in [None, "find", "ps", "query"] and not args.reset
+
+    state = genv.core.devices.State(args.cleanup, args.reset)
+
+    with genv.utils.global_lock(shared=read_only):
+        # the devices are locked as well in case they are sharded
+        with nullcontext() if read_only else state.lock():
+            devices = state.load()
+
             if args.command == "attach":
                 do_attach(
                     devices,
@@ -325,6 +342,7 @@ def run(args: argparse.Namespace) -> None:
                     args.count,
                     args.index,
                     args.allow_over_subscription,
+                    args.allocation_policy,
                 )
             elif args.command == "detach":
                 do_detach(devices, args.eid, args.index, args.quiet)
@@ -336,3 +354,6 @@ def run(args: argparse.Namespace) -> None:
                 do_query(devices, args.queries)
             else:
                 do_ps(devices, format="tui", header=True, timestamp=False)
+
+            if not read_only:
+                state.commit()
@@ -1,5 +1,6 @@
 import argparse
 import asyncio
+from contextlib import AsyncExitStack
 
 import genv
 
@@ -16,6 +17,12 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
         help="interval in seconds between enforcement cycles; 0 means run once (default: %(default)s)",
     )
 
+    parser.add_argument(
+        "--sampling-interval",
+        type=float,
+        help="keep nvidia-smi running and sample devices every given seconds (e.g. 0.5) instead of running it on every enforcement cycle",
+    )
+
     enforcements = parser.add_argument_group("enforcements")
 
     def add_enforcement(
@@ -89,9 +96,26 @@ async def run(args: argparse.Namespace) -> None:
     Runs the "genv enforce" logic.
     """
 
+    async with AsyncExitStack() as stack:
+        # compute processes are queried rather than taken from other processes
+        stack.enter_context(genv.utils.nvidia_smi.fresh())
+
+        if args.sampling_interval and args.interval != 0:
+            sampler = await stack.enter_async_context(
+                genv.utils.drivers.Sampler(args.sampling_interval)
+            )
+
+            stack.enter_context(genv.utils.drivers.use(sampler))
+
+        await enforce(args)
+
+
+async def enforce(args: argparse.Namespace) -> None:
+    """
+    Runs enforcement cycles.
+    """
     while True:
-        with genv.utils.global_lock():
-            snapshot = await genv.core.snapshot()
+        snapshot = await genv.core.snapshot()
 
         survey = genv.entities.enforce.Survey(snapshot)
 
@@ -113,7 +137,7 @@ async def run(args: argparse.Namespace) -> None:
                 ),
             )
 
-        with genv.utils.global_lock():
+        async with genv.utils.aglobal_lock():
             genv.enforce.execute(survey.report)
 
         if args.interval == 0:
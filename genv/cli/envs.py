@@ -248,26 +248,35 @@ def run(args: argparse.Namespace) -> None:
     Runs the "genv envs" logic.
     """
 
-    with genv.utils.global_lock():
-        with genv.core.envs.State(args.cleanup, args.reset) as envs:
-            if args.command == "activate":
-                do_activate(
-                    envs,
-                    args.eid,
-                    args.uid,
-                    args.username,
-                    args.pid,
-                    args.kernel_id,
-                )
-            elif args.command == "config":
-                do_config(envs, args.eid, command=args.config, args=args)
-            elif args.command == "deactivate":
-                do_deactivate(envs, args.pid)
-            elif args.command == "find":
-                do_find(envs, args.pid, args.kernel_id)
-            elif args.command == "ps":
-                do_ps(envs, args.format, args.header, args.timestamp)
-            elif args.command == "query":
-                do_query(envs, args.eid, args.queries)
-            else:
-                do_ps(envs, format="tui", header=True, timestamp=False)
+    # commands that only read the state do not save it and can run concurrently
+    read_only = args.command in [None, "find", "ps", "query"] and not args.reset
+
+    state = genv.core.envs.State(args.cleanup, args.reset)
+
+    with genv.utils.global_lock(shared=read_only):
+        envs = state.load()
+
+        if args.command == "activate":
+            do_activate(
+                envs,
+                args.eid,
+                args.uid,
+                args.username,
+                args.pid,
+                args.kernel_id,
+            )
+        elif args.command == "config":
+            do_config(envs, args.eid, command=args.config, args=args)
+        elif args.command == "deactivate":
+            do_deactivate(envs, args.pid)
+        elif args.command == "find":
+            do_find(envs, args.pid, args.kernel_id)
+        elif args.command == "ps":
+            do_ps(envs, args.format, args.header, args.timestamp)
+        elif args.command == "query":
+            do_query(envs, args.eid, args.queries)
+        else:
+            do_ps(envs, format="tui", header=True, timestamp=False)
+
+        if not read_only:
+            state.commit()
@@ -69,8 +69,7 @@ def do_attach(model: str) -> NoReturn:
     :param model: Model name.
     """
 
-    with genv.utils.global_lock():
-        envs = genv.core.envs.snapshot()
+    envs = genv.core.envs.snapshot()
 
     for env in envs:
         if not env.config.name:
@@ -101,8 +100,7 @@ def do_ps(format: str, header: bool, timestamp: bool) -> None:
 
     :return: None
     """
-    with genv.utils.global_lock():
-        envs = genv.core.envs.snapshot()
+    envs = genv.core.envs.snapshot()
 
     if header:
         if format == "csv":
@@ -1,6 +1,7 @@
 import argparse
+import asyncio
+from contextlib import AsyncExitStack
 import sys
-import time
 
 import genv
 
@@ -32,6 +33,12 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
         help="Interval in seconds between collections (default: %(default)s)",
     )
 
+    parser.add_argument(
+        "--sampling-interval",
+        type=float,
+        help="Keep nvidia-smi running and sample devices every given seconds (e.g. 0.5) instead of running it on every collection",
+    )
+
 
 async def run(args: argparse.Namespace) -> None:
     """
@@ -60,13 +67,40 @@ async def run(args: argparse.Namespace) -> None:
 
     collection = Collection(SPECS)
 
+    async with AsyncExitStack() as stack:
+        if args.sampling_interval:
+            sampler = await stack.enter_async_context(
+                genv.utils.drivers.Sampler(args.sampling_interval)
+            )
+
+            stack.enter_context(genv.utils.drivers.use(sampler))
+
+        # processes save their statistics only while they are collected
+        genv.utils.enable_statistics()
+        stack.callback(genv.utils.disable_statistics)
+
+        await collect(collection, args.interval)
+
+
+async def collect(collection, interval: int) -> None:
+    """
+    Updates metrics every interval.
+    """
+    statistics = genv.utils.statistics.Statistics()
+
     while True:
-        system = await genv.core.system()
+        # devices are queried once for both the system information and the snapshot
+        query = await genv.utils.drivers.get().query()
 
-        with genv.utils.global_lock():
-            snapshot = await genv.core.snapshot()
+        system = await genv.core.system(query)
+        snapshot = await genv.core.snapshot(query)
 
         collection.cleanup(system, snapshot)
         collection.update(system, snapshot)
 
-        time.sleep(args.interval)
+        # statistics are added up as processes remove them when collected
+        statistics.update(genv.utils.statistics.pop())
+        statistics.update(genv.utils.collect_statistics())
+        collection.update_statistics(statistics)
+
+        await asyncio.sleep(interval)
@@ -0,0 +1,85 @@
+import argparse
+import time
+from typing import Iterable
+
+import genv
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds "genv reaper" arguments to a parser.
+    """
+
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=int,
+        default=10,
+        help="Interval in seconds between full cleanups, e.g. for Jupyter kernels (default: %(default)s)",
+    )
+
+
+def reap(exited: Iterable[int]) -> None:
+    """
+    Deactivates environments that have no running processes and detaches them from devices.
+
+    :param exited: Processes that are known to have exited
+    """
+    exited = set(exited)
+
+    with genv.utils.global_lock():
+        with genv.core.envs.State(cleanup=False) as envs:
+            eids = set(envs.eids)
+
+            envs.cleanup(
+                poll_pid=lambda pid: pid not in exited and genv.utils.poll_pid(pid),
+                poll_kernel=genv.utils.poll_jupyter_kernel,
+            )
+
+            eids -= set(envs.eids)
+
+        genv.core.devices.cleanup()
+
+    for eid in sorted(eids):
+        print(f"Deactivated environment {eid}", flush=True)
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Runs the "genv reaper" logic.
+    """
+
+    # this also creates the temporary directory if it does not exist
+    reap([])
+    deadline = time.monotonic() + args.interval
+
+    try:
+        directory = genv.utils.watch.DirectoryWatcher(genv.utils.get_temp_file_path(""))
+    except OSError:
+        directory = None  # the state is polled every interval instead
+
+    watcher = genv.utils.watch.ProcessWatcher(directory)
+
+    try:
+        state = genv.core.envs.State(cleanup=False)
+        generation = None
+
+        while True:
+            if time.monotonic() >= deadline:
+                reap([])
+                deadline = time.monotonic() + args.interval
+
+            # the generation is read before loading so that later changes are not missed
+            if state.generation != generation:
+                generation = state.generation
+                watcher.watch(pid for env in state.load() for pid in env.pids)
+
+            exited = watcher.wait(max(0, deadline - time.monotonic()))
+
+            if exited:
+                reap(exited)
+    finally:
+        watcher.close()
+
+        if directory:
+            directory.close()
@@ -189,6 +189,7 @@ async def do_enforce(
                 hosts=[host for host, report in zip(hosts, reports) if report],
                 throw_on_error=config.throw_on_error,
                 quiet=config.quiet,
+                timeout=config.timeout,
             ),
             reports=[report for report in reports if report],
         )
@@ -387,21 +388,66 @@ async def do_monitor(
 
     collection = Collection(SPECS)
 
+    # hosts that are known to have genv installed are queried for system information and a snapshot
+    # using a single command. other hosts, and hosts that fail doing so (e.g. older versions of genv),
+    # are queried for system information first and then for a snapshot if genv is installed.
+    merged_hostnames = set()
+    unmerged_hostnames = set()
+
     while True:
-        hosts, systems = await genv.remote.core.system(config)
+        hostname_to_system = {}
+        hostname_to_snapshot = {}
 
-        hosts_with_genv = [
-            host for host, system in zip(hosts, systems) if system.genv.installed
+        merged_hosts = [
+            host for host in config.hosts if host.hostname in merged_hostnames
         ]
 
-        hosts_with_snapshots, snapshots = await genv.remote.core.snapshot(
-            dataclasses.replace(config, hosts=hosts_with_genv)
-        )
+        if merged_hosts:
+            hosts, systems, snapshots = await genv.remote.core.system_and_snapshot(
+                dataclasses.replace(
+                    config, hosts=merged_hosts, throw_on_error=False, quiet=True
+                )
+            )
+
+            for host, system, snapshot in zip(hosts, systems, snapshots):
+                hostname_to_system[host.hostname] = system
+                hostname_to_snapshot[host.hostname] = snapshot
+
+        other_hosts = [
+            host for host in config.hosts if host.hostname not in hostname_to_system
+        ]
+
+        if other_hosts:
+            hosts, systems = await genv.remote.core.system(
+                dataclasses.replace(config, hosts=other_hosts)
+            )
+
+            hosts_with_genv = [
+                host for host, system in zip(hosts, systems) if system.genv.installed
+            ]
 
-        hostname_to_snapshot = {
-            host.hostname: snapshot
-            for host, snapshot in zip(hosts_with_snapshots, snapshots)
-        }
+            for host, system in zip(hosts, systems):
+                hostname_to_system[host.hostname] = system
+
+            if hosts_with_genv:
+                hosts, snapshots = await genv.remote.core.snapshot(
+                    dataclasses.replace(config, hosts=hosts_with_genv)
+                )
+
+                for host, snapshot in zip(hosts, snapshots):
+                    hostname_to_snapshot[host.hostname] = snapshot
+
+                # hosts that are reachable but failed the single command do not support it
+                unmerged_hostnames |= merged_hostnames & {
+                    host.hostname for host in hosts
+                }
+
+                merged_hostnames = (
+                    merged_hostnames | {host.hostname for host in hosts_with_genv}
+                ) - unmerged_hostnames
+
+        hosts = [host for host in config.hosts if host.hostname in hostname_to_system]
+        systems = [hostname_to_system[host.hostname] for host in hosts]
 
         # inflate snapshots to match hosts
         snapshots = [hostname_to_snapshot.get(host.hostname, None) for host in hosts]
@@ -470,6 +516,12 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
         help="SSH connection timeout",
     )
 
+    parser.add_argument(
+        "--command-timeout",
+        type=int,
+        help="Maximum time in seconds for commands to run on every host",
+    )
+
     parser.add_argument(
         "-e",
         "--exit-on-error",
@@ -735,7 +787,9 @@ async def run(args: argparse.Namespace) -> None:
     """
 
     hosts = parse_hosts(args)
-    config = genv.remote.Config(hosts, args.throw_on_error, args.quiet)
+    config = genv.remote.Config(
+        hosts, args.throw_on_error, args.quiet, args.command_timeout
+    )
 
     if args.command == "activate":
         await do_activate(config, args.gpus, args.name, args.prompt)
@@ -11,22 +11,32 @@ import genv
 async def do_execute() -> None:
     report = json.loads(sys.stdin.read(), cls=genv.JSONDecoder)
 
-    with genv.utils.global_lock():
+    async with genv.utils.aglobal_lock():
         genv.enforce.execute(report)
 
 
-async def do_snapshot(format: str, type: Optional[str]) -> None:
-    with genv.utils.global_lock():
-        if type is None:
-            snapshot = await genv.core.snapshot()
-        elif type == "devices":
-            snapshot = genv.core.devices.snapshot()
-        elif type == "envs":
-            snapshot = genv.core.envs.snapshot()
-        elif type == "processes":
-            snapshot = await genv.core.processes.snapshot()
-        else:
-            raise ValueError(f"Unsupported snapshot type ({type})")
+async def do_snapshot(format: str, type: Optional[str], system: bool) -> None:
+    if system:
+        if type is not None:
+            raise ValueError("System information is supported only in full snapshots")
+
+        # devices are queried once for both the system information and the snapshot
+        query = await genv.utils.drivers.get().query()
+
+        snapshot = dict(
+            system=await genv.core.system(query),
+            snapshot=await genv.core.snapshot(query),
+        )
+    elif type is None:
+        snapshot = await genv.core.snapshot()
+    elif type == "devices":
+        snapshot = genv.core.devices.snapshot()
+    elif type == "envs":
+        snapshot = genv.core.envs.snapshot()
+    elif type == "processes":
+        snapshot = await genv.core.processes.snapshot()
+    else:
+        raise ValueError(f"Unsupported snapshot type ({type})")
 
     if format == "json":
         print(json.dumps(snapshot, cls=genv.JSONEncoder, indent=2))
@@ -56,6 +66,12 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
             help="Take a snapshot of specific information",
         )
 
+        parser.add_argument(
+            "--system",
+            action="store_true",
+            help="Also output system information along with the snapshot",
+        )
+
     for command, help in [
         (execute, "Execute the report passed in stdin"),
         (snapshot, "Take a snapshot of GPU usage"),
@@ -71,4 +87,4 @@ async def run(args: argparse.Namespace) -> None:
     if args.command == "execute":
         await do_execute()
     elif args.command == "snapshot":
-        await do_snapshot(args.format, args.type)
+        await do_snapshot(args.format, args.type, args.system)
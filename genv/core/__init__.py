@@ -4,3 +4,4 @@ from . import devices
 from . import processes
 from .snapshot import snapshot
 from .system import system
+from .transaction import Transaction, transaction
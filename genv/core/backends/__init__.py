@@ -0,0 +1,6 @@
+from .backend import Backend, Schema
+from . import cache
+from .journal import Backend as Journal
+from .json_ import Backend as JSON
+from .sqlite import Backend as SQLite
+from .utils import create
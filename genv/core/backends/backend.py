@@ -0,0 +1,103 @@
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from dataclasses import dataclass
+import os
+from typing import Any, Callable, ContextManager, Dict, Iterable, Optional, Tuple
+
+import genv.utils
+
+
+@dataclass
+class Schema:
+    """
+    Describes how a state is split into rows.
+
+    :param split: A lambda returning the rows of a state by their keys
+    :param join: A lambda assembling a state from rows
+    :param indices: A lambda returning the (name, value) index entries of a row
+    :param convert: A lambda converting a loaded document from older formats if needed
+    """
+
+    split: Callable[[Any], Dict[str, Any]]
+    join: Callable[[Iterable[Any]], Any]
+    indices: Callable[[Any], Iterable[Tuple[str, Any]]]
+    convert: Callable[[Any], Any]
+
+
+class Backend(ABC):
+    """
+    A state storage backend.
+    """
+
+    def __init__(self, path: str, schema: Schema) -> None:
+        self._path = path
+        self._schema = schema
+
+    @property
+    def rows(self) -> bool:
+        """Returns whether this backend reads and writes single rows."""
+        return False
+
+    @property
+    def concurrent(self) -> bool:
+        """
+        Returns whether saves of different rows can run concurrently without
+        holding the global lock.
+        """
+        return False
+
+    def generation(self) -> int:
+        """
+        Returns the generation of the state.
+        The generation is incremented every time a new version of the state is saved.
+        """
+        return genv.utils.get_generation(self._path)
+
+    def cleaned(self) -> float:
+        """Returns the time of the last full cleanup of the state; zero if never."""
+        try:
+            return os.stat(f"{self._path}.cleaned").st_mtime
+        except FileNotFoundError:
+            return 0
+
+    def mark_cleaned(self) -> None:
+        """Records that the state was fully cleaned up now."""
+        path = f"{self._path}.cleaned"
+
+        try:
+            with genv.utils.Umask(0):
+                os.close(os.open(path, os.O_WRONLY | os.O_CREAT, 0o666))
+
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # the temp directory was not created yet
+
+    @abstractmethod
+    def load(self, where: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """
+        Loads a state.
+        Returns None if the state does not exist.
+
+        Loading does not require holding the global lock and always returns a
+        consistent state even if it is being saved at the same time.
+
+        :param where: Load only rows matching these index values; ignored by non-row backends
+        """
+        pass
+
+    @abstractmethod
+    def save(self, o: Any, keys: Optional[Iterable[str]] = None) -> None:
+        """
+        Saves a state.
+        Should be called while holding the global lock.
+
+        :param keys: Keys of the rows that were loaded; all other rows are replaced if not passed
+        """
+        pass
+
+    def atomic(self) -> ContextManager:
+        """
+        Returns a context in which saves of states of this backend are committed
+        together, where supported. States are saved one by one by default.
+        """
+        return nullcontext()
@@ -0,0 +1,30 @@
+import pickle
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# a single entry is kept per state which holds its latest loaded version
+_entries: Dict[str, Tuple[Hashable, bytes]] = {}
+
+
+def get(name: str, stamp: Hashable) -> Optional[Any]:
+    """
+    Returns a copy of a cached state if its stamp matches.
+
+    States are cached as an immutable serialized copy and every call returns a new
+    copy, so callers can modify the returned state without corrupting the cache.
+    """
+    entry = _entries.get(name)
+
+    if entry is None or entry[0] != stamp:
+        return None
+
+    return pickle.loads(entry[1])
+
+
+def put(name: str, stamp: Hashable, o: Any) -> None:
+    """Caches a state with the stamp of the version it was loaded from."""
+    _entries[name] = (stamp, pickle.dumps(o, pickle.HIGHEST_PROTOCOL))
+
+
+def clear() -> None:
+    """Clears the cache."""
+    _entries.clear()
@@ -0,0 +1,185 @@
+import json
+import os
+from typing import Any, Dict, Iterable, Optional
+
+import genv.utils
+import genv.serialization
+
+from .backend import Backend as Base, Schema
+
+PUT = "put"
+DELETE = "del"
+
+
+def _max_size() -> int:
+    """Returns the journal size in bytes above which it is compacted."""
+    return int(os.environ.get("GENV_JOURNAL_MAX_SIZE", 64 * 1024))
+
+
+class Backend(Base):
+    """
+    Keeps a state as a JSON checkpoint file and an append-only journal of row changes.
+
+    Saving appends a record for every row that was added, changed or removed since
+    the state was loaded. Loading replays the journal on top of the checkpoint.
+    The journal is compacted into the checkpoint once it passes a size threshold.
+
+    Journal records are single lines of tab-separated fields:
+        put <key> <row>
+        del <key>
+
+    A partially written trailing record (e.g. if a process crashed while saving) is ignored
+    when loading and truncated before the next records are appended. This also lets readers
+    load the state without locking while records are being appended. Records that cannot be
+    decoded are skipped.
+    """
+
+    def __init__(self, path: str, schema: Schema) -> None:
+        super().__init__(path, schema)
+
+        self._journal = f"{os.path.splitext(path)[0]}.journal"
+        self._loaded = None
+
+    @property
+    def rows(self) -> bool:
+        return True
+
+    def _encode(self, row: Any) -> str:
+        return json.dumps(row, cls=genv.serialization.JSONEncoder)
+
+    def _decode(self, value: str) -> Any:
+        return json.loads(value, cls=genv.serialization.JSONDecoder)
+
+    def _read_checkpoint(self) -> Optional[Any]:
+        if not os.path.exists(self._path):
+            return None
+
+        with open(self._path) as f:
+            return json.load(f, cls=genv.serialization.JSONDecoder)
+
+    def _read_journal(self) -> Iterable[Iterable[str]]:
+        if not os.path.exists(self._journal):
+            return []
+
+        with open(self._journal) as f:
+            lines = f.read().split("\n")
+
+        # the last item is either empty or a partially written record
+        return [line.split("\t", 2) for line in lines[:-1]]
+
+    def load(self, where: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        # the generation is incremented after a new checkpoint is written and before
+        # the journal is truncated, so reading the same generation before and after
+        # reading both files ensures that they match.
+        while True:
+            generation = self.generation()
+
+            o = self._read_checkpoint()
+            records = self._read_journal()
+
+            if self.generation() == generation:
+                break
+
+        if o is None and not records:
+            self._loaded = None
+            return None
+
+        o = self._schema.convert(o) if o is not None else self._schema.join([])
+
+        objects = self._schema.split(o)
+        rows = {key: self._encode(row) for key, row in objects.items()}
+
+        for record in records:
+            try:
+                op, key = record[0], json.loads(record[1])
+
+                if op == PUT and len(record) == 3:
+                    objects[key] = self._decode(record[2])
+                    rows[key] = record[2]
+                elif op == DELETE and len(record) == 2:
+                    objects.pop(key, None)
+                    rows.pop(key, None)
+            except (IndexError, ValueError):
+                continue  # a corrupted record
+
+        self._loaded = rows
+
+        if not records:
+            return o
+
+        return self._schema.join(objects.values())
+
+    def save(self, o: Any, keys: Optional[Iterable[str]] = None) -> None:
+        rows = {key: self._encode(row) for key, row in self._schema.split(o).items()}
+
+        if self._loaded is None:
+            self._compact(o)
+        else:
+            records = [
+                f"{PUT}\t{json.dumps(key)}\t{value}\n"
+                for key, value in rows.items()
+                if self._loaded.get(key) != value
+            ] + [
+                f"{DELETE}\t{json.dumps(key)}\n"
+                for key in self._loaded.keys()
+                if key not in rows
+            ]
+
+            if records:
+                if self._append("".join(records)) > _max_size():
+                    self._compact(o)
+                else:
+                    genv.utils.bump_generation(self._path)
+
+        self._loaded = rows
+
+    def _append(self, records: str) -> int:
+        """
+        Appends records to the journal.
+
+        :return: The journal size after appending
+        """
+        with genv.utils.Umask(0):
+            fd = os.open(self._journal, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o666)
+
+        try:
+            self._truncate_partial(fd)
+
+            data = memoryview(records.encode("utf-8"))
+
+            while data:
+                data = data[os.write(fd, data) :]
+
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    def _truncate_partial(self, fd: int) -> None:
+        """Truncates a partially written trailing record from the journal if there is one."""
+        size = os.fstat(fd).st_size
+        end = size
+
+        while end > 0:
+            start = max(0, end - 4096)
+            newline = os.pread(fd, end - start, start).rfind(b"\n")
+
+            if newline != -1:
+                end = start + newline + 1
+                break
+
+            end = start
+
+        if end != size:
+            os.ftruncate(fd, end)
+
+    def _compact(self, o: Any) -> None:
+        """Writes a new checkpoint and truncates the journal."""
+
+        genv.utils.save_state(
+            o, self._path, json_encoder=genv.serialization.JSONEncoder
+        )
+
+        genv.utils.bump_generation(self._path)
+
+        if os.path.exists(self._journal):
+            os.truncate(self._journal, 0)
@@ -0,0 +1,60 @@
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import genv.utils
+import genv.serialization
+
+from . import cache
+from .backend import Backend as Base
+
+
+def _stamp(stat: os.stat_result, generation: int) -> Tuple[int, int, int, int]:
+    """
+    Returns a stamp identifying the version of a state file.
+
+    The generation distinguishes between versions even if the inode number of a
+    replaced file is reused with the same modification time and size.
+    """
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size, generation)
+
+
+class Backend(Base):
+    """
+    Keeps a state as a single JSON document.
+    The document is replaced atomically so it can be read without locking.
+
+    Loaded documents are cached in-process until the file changes on disk.
+    """
+
+    def load(self, where: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        # the generation is read before opening the file so it is never newer than
+        # the version that is read
+        generation = self.generation()
+
+        try:
+            f = open(self._path)
+        except FileNotFoundError:
+            return None
+
+        with f:
+            stamp = _stamp(os.fstat(f.fileno()), generation)
+
+            o = cache.get(self._path, stamp)
+
+            if o is None:
+                o = json.load(f, cls=genv.serialization.JSONDecoder)
+
+                cache.put(self._path, stamp, o)
+
+        return o
+
+    def save(self, o: Any, keys: Optional[Iterable[str]] = None) -> None:
+        genv.utils.save_state(
+            o, self._path, json_encoder=genv.serialization.JSONEncoder
+        )
+
+        generation = genv.utils.bump_generation(self._path)
+
+        # no one else can replace the file as we are holding the global lock
+        cache.put(self._path, _stamp(os.stat(self._path), generation), o)
@@ -0,0 +1,354 @@
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import genv.utils
+import genv.serialization
+
+from . import cache
+from .backend import Backend as Base, Schema
+
+DATABASE_FILENAME = "genv.db"
+
+# NOTE(raz): we use plain INSERT/UPDATE statements and not UPSERT as the latter is
+# not supported by the SQLite versions that are shipped with some older Python versions.
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, generation INTEGER NOT NULL DEFAULT 0, cleaned REAL NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS rows (name TEXT, key TEXT, value TEXT, PRIMARY KEY (name, key));
+CREATE TABLE IF NOT EXISTS indices (name TEXT, key TEXT, field TEXT, value TEXT);
+CREATE INDEX IF NOT EXISTS indices_by_value ON indices (name, field, value);
+CREATE INDEX IF NOT EXISTS indices_by_key ON indices (name, key);
+"""
+
+# older SQLite versions limit the number of host parameters in a statement to 999
+MAX_PARAMETERS = 500
+
+# connections of atomic saves by database path
+_atomic: Dict[str, sqlite3.Connection] = {}
+
+# open connections and the inode numbers of their databases by process, thread and
+# database path, so that the schema is created once and loads and saves reuse them
+_connections: Dict[Tuple[int, int, str], Tuple[int, sqlite3.Connection]] = {}
+
+
+def _chunks(items: Iterable[Any]) -> Iterable[Iterable[Any]]:
+    items = list(items)
+
+    for i in range(0, len(items), MAX_PARAMETERS):
+        yield items[i : i + MAX_PARAMETERS]
+
+
+def _placeholders(items: Iterable[Any]) -> str:
+    return ",".join("?" for _ in items)
+
+
+class Backend(Base):
+    """
+    Keeps states as indexed rows in an SQLite database in the Genv temporary directory.
+    Each state is stored under the basename of its state file (e.g. "envs").
+    The database uses write-ahead logging so it can be read without locking.
+    States can be saved atomically together using atomic().
+
+    Fully loaded states are cached in-process until their generation changes.
+    """
+
+    def __init__(self, path: str, schema: Schema) -> None:
+        super().__init__(path, schema)
+
+        self._database = os.path.join(os.path.dirname(path), DATABASE_FILENAME)
+        self._name = os.path.splitext(os.path.basename(path))[0]
+
+    @property
+    def _cache_name(self) -> str:
+        return f"{self._database}:{self._name}"
+
+    @property
+    def rows(self) -> bool:
+        return True
+
+    @contextmanager
+    def _connect(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        """
+        Connects to the database.
+        Yields None if the database does not exist and should not be created.
+        Yields the connection of the atomic saves of the database if in one.
+
+        Connections are kept open and reused by later calls in the same thread.
+        A transaction that is open when an exception is raised is rolled back.
+        """
+        if self._database in _atomic:
+            yield _atomic[self._database]
+            return
+
+        try:
+            inode = os.stat(self._database).st_ino
+        except FileNotFoundError:
+            if not create:
+                yield None
+                return
+
+            # make sure that any Linux user would have permissions to the database
+            # like we do for state files. SQLite creates its journal files with the
+            # same permissions as the database.
+            with genv.utils.Umask(0):
+                os.close(os.open(self._database, os.O_RDWR | os.O_CREAT, 0o666))
+
+            inode = os.stat(self._database).st_ino
+
+        # connections are not shared with forked processes and other threads
+        key = (os.getpid(), threading.get_ident(), self._database)
+
+        if key in _connections and _connections[key][0] == inode:
+            connection = _connections[key][1]
+        else:
+            # the database was recreated
+            if key in _connections:
+                _connections.pop(key)[1].close()
+
+            connection = sqlite3.connect(
+                self._database, timeout=60, isolation_level=None
+            )
+
+            try:
+                connection.executescript(SCHEMA)
+                self._migrate(connection)
+            except BaseException:
+                connection.close()
+                raise
+
+            _connections[key] = (inode, connection)
+
+        try:
+            yield connection
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+
+            raise
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        """Adds columns that are missing in databases created by older versions."""
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(files)")]
+
+        if "cleaned" not in columns:
+            try:
+                connection.execute(
+                    "ALTER TABLE files ADD COLUMN cleaned REAL NOT NULL DEFAULT 0"
+                )
+            except sqlite3.OperationalError:
+                pass  # added concurrently by another process
+
+    def _encode(self, row: Any) -> str:
+        return json.dumps(row, cls=genv.serialization.JSONEncoder)
+
+    def _decode(self, value: str) -> Any:
+        return json.loads(value, cls=genv.serialization.JSONDecoder)
+
+    def _generation(self, connection: sqlite3.Connection) -> Optional[int]:
+        """Returns the generation of the state or None if it does not exist."""
+        row = connection.execute(
+            "SELECT generation FROM files WHERE name = ?", (self._name,)
+        ).fetchone()
+
+        return row[0] if row else None
+
+    def _exists(self, connection: sqlite3.Connection) -> bool:
+        return self._generation(connection) is not None
+
+    @property
+    def concurrent(self) -> bool:
+        return True
+
+    def generation(self) -> int:
+        with self._connect() as connection:
+            if connection is None:
+                return 0
+
+            return self._generation(connection) or 0
+
+    def cleaned(self) -> float:
+        with self._connect() as connection:
+            if connection is None:
+                return 0
+
+            row = connection.execute(
+                "SELECT cleaned FROM files WHERE name = ?", (self._name,)
+            ).fetchone()
+
+            return row[0] if row else 0
+
+    def mark_cleaned(self) -> None:
+        with self._connect() as connection:
+            if connection is None:
+                return
+
+            connection.execute(
+                "UPDATE files SET cleaned = ? WHERE name = ?",
+                (time.time(), self._name),
+            )
+
+    def load(self, where: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        with self._connect() as connection:
+            if connection is None:
+                return None
+
+            # loading while in an atomic save reads in its transaction
+            began = not connection.in_transaction
+
+            if began:
+                connection.execute("BEGIN")
+
+            try:
+                generation = self._generation(connection)
+
+                if generation is None:
+                    return None
+
+                if not where:
+                    # the inode number distinguishes between recreated databases
+                    stamp = (os.stat(self._database).st_ino, generation)
+
+                    o = cache.get(self._cache_name, stamp)
+
+                    if o is not None:
+                        return o
+
+                query = "SELECT value FROM rows WHERE name = ?"
+                parameters = [self._name]
+
+                for field, value in (where or {}).items():
+                    values = value if isinstance(value, list) else [value]
+
+                    query += f" AND key IN (SELECT key FROM indices WHERE name = ? AND field = ? AND value IN ({_placeholders(values)}))"
+                    parameters += [self._name, field, *map(str, values)]
+
+                values = [value for (value,) in connection.execute(query, parameters)]
+            finally:
+                if began:
+                    connection.execute("COMMIT")
+
+        o = self._schema.join([self._decode(value) for value in values])
+
+        if not where:
+            cache.put(self._cache_name, stamp, o)
+
+        return o
+
+    def save(self, o: Any, keys: Optional[Iterable[str]] = None) -> None:
+        rows = self._schema.split(o)
+
+        with self._connect(create=True) as connection:
+            # the transaction is rolled back on errors unless in an atomic save
+            if not connection.in_transaction:
+                connection.execute("BEGIN IMMEDIATE")
+
+            self._save(connection, rows, keys)
+
+            # atomic saves are committed together when they end
+            if self._database not in _atomic:
+                connection.execute("COMMIT")
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        """
+        Saves of all states in the database are committed in a single transaction.
+        Nothing is committed if an exception is raised.
+        """
+        if self._database in _atomic:
+            yield
+            return
+
+        with self._connect(create=True) as connection:
+            _atomic[self._database] = connection
+
+            try:
+                yield
+            finally:
+                del _atomic[self._database]
+
+            if connection.in_transaction:
+                connection.execute("COMMIT")
+
+    def _save(
+        self,
+        connection: sqlite3.Connection,
+        rows: Dict[str, Any],
+        keys: Optional[Iterable[str]],
+    ) -> None:
+        if keys is None or not self._exists(connection):
+            # replace all rows
+            existing = dict(
+                connection.execute(
+                    "SELECT key, value FROM rows WHERE name = ?", (self._name,)
+                ).fetchall()
+            )
+
+            connection.execute(
+                "INSERT OR IGNORE INTO files (name) VALUES (?)", (self._name,)
+            )
+        else:
+            keys = set(keys) | set(rows.keys())
+            existing = {}
+
+            for chunk in _chunks(keys):
+                existing.update(
+                    connection.execute(
+                        f"SELECT key, value FROM rows WHERE name = ? AND key IN ({_placeholders(chunk)})",
+                        [self._name, *chunk],
+                    ).fetchall()
+                )
+
+        changed = []
+
+        for key, row in rows.items():
+            value = self._encode(row)
+
+            if key not in existing:
+                connection.execute(
+                    "INSERT INTO rows (name, key, value) VALUES (?, ?, ?)",
+                    (self._name, key, value),
+                )
+            elif existing[key] != value:
+                connection.execute(
+                    "UPDATE rows SET value = ? WHERE name = ? AND key = ?",
+                    (value, self._name, key),
+                )
+            else:
+                continue
+
+            changed.append(key)
+
+        removed = [key for key in existing if key not in rows]
+
+        for chunk in _chunks(removed):
+            connection.execute(
+                f"DELETE FROM rows WHERE name = ? AND key IN ({_placeholders(chunk)})",
+                [self._name, *chunk],
+            )
+
+        for chunk in _chunks(changed + removed):
+            connection.execute(
+                f"DELETE FROM indices WHERE name = ? AND key IN ({_placeholders(chunk)})",
+                [self._name, *chunk],
+            )
+
+        connection.executemany(
+            "INSERT INTO indices (name, key, field, value) VALUES (?, ?, ?, ?)",
+            [
+                (self._name, key, field, str(value))
+                for key in changed
+                for field, value in self._schema.indices(rows[key])
+                if value is not None
+            ],
+        )
+
+        if changed or removed:
+            connection.execute(
+                "UPDATE files SET generation = generation + 1 WHERE name = ?",
+                (self._name,),
+            )
@@ -0,0 +1,28 @@
+import os
+
+from .backend import Backend, Schema
+from .journal import Backend as Journal
+from .json_ import Backend as JSON
+from .sqlite import Backend as SQLite
+
+BACKENDS = {
+    "journal": Journal,
+    "json": JSON,
+    "sqlite": SQLite,
+}
+
+
+def create(path: str, schema: Schema) -> Backend:
+    """
+    Creates the configured state backend for a state file.
+
+    Raises 'RuntimeError' if the environment variable "GENV_STATE_BACKEND" is not a supported backend.
+    """
+    name = os.environ.get("GENV_STATE_BACKEND", "json")
+
+    if name not in BACKENDS:
+        raise RuntimeError(
+            f"Unsupported state backend '{name}' (supported: {', '.join(BACKENDS)})"
+        )
+
+    return BACKENDS[name](path, schema)
@@ -1,6 +1,5 @@
-from contextlib import ExitStack, contextmanager
-import subprocess
-from typing import Any, Iterable, Optional, Union
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterable, Optional, Tuple, Union
 
 import genv.utils
 from genv.entities import Device, Devices, Env
@@ -12,22 +11,25 @@ from .utils import File
 
 
 class State(File[Devices]):
-    def __init__(self, cleanup: bool = True, reset: bool = False) -> None:
+    # cleaning up devices only requires an environments snapshot
+    _rate_limited = False
+
+    def __init__(
+        self,
+        cleanup: bool = True,
+        reset: bool = False,
+        *,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> None:
         super().__init__(
             genv.utils.get_temp_file_path("devices.json"),
             cleanup,
             reset,
+            where=where,
         )
 
     def _create(self):
-        # move to genv.utils.nvidia_smi once async is supported here
-        devices_total_memory = [
-            f"{int(line)}mi"
-            for line in subprocess.check_output(
-                "GENV_BYPASS=1 nvidia-smi --query-gpu=memory.total --format=csv,noheader,nounits",
-                shell=True,
-            ).splitlines()
-        ]
+        devices_total_memory = genv.utils.drivers.get().total_memory()
 
         return Devices(
             [
@@ -36,6 +38,15 @@ class State(File[Devices]):
             ]
         )
 
+    def _split(self, devices: Devices) -> Dict[str, Device]:
+        return {str(device.index): device for device in devices}
+
+    def _join(self, rows: Iterable[Device]) -> Devices:
+        return Devices(sorted(rows, key=lambda device: device.index))
+
+    def _indices(self, device: Device) -> Iterable[Tuple[str, Any]]:
+        return [("index", device.index), *(("eid", eid) for eid in device.eids)]
+
     def _convert(self, o: Union[Any, Devices]) -> Devices:
         # the following logic converts state files from versions <= 0.8.0.
         # note that the indicator is 'o.devices' and not 'o' itself because the structure of
@@ -62,10 +73,76 @@ class State(File[Devices]):
 
         return o
 
-    def _clean(self, devices: Devices) -> None:
+    def _clean(self, devices: Devices, keys: Optional[Iterable[str]] = None) -> None:
         envs = genv.core.envs.snapshot()
 
-        devices.cleanup(poll_eid=lambda eid: eid in envs.eids)
+        devices.cleanup(poll_eid=lambda eid: eid in envs)
+
+    def lock(self) -> ContextManager:
+        if not self.concurrent:
+            return super().lock()
+
+        indices = (self._where or {}).get("index")
+
+        if indices is None:
+            return genv.utils.access_lock(
+                _get_shards_lock_path(), timeout=genv.utils.get_lock_timeout()
+            )
+
+        return _lock_shards(indices if isinstance(indices, list) else [indices])
+
+
+def _get_shards_lock_path(index: Optional[int] = None) -> str:
+    """
+    Returns the path of the lock of the state of a device.
+    Returns the path of the lock of the entire devices state if no index is passed.
+    """
+    if index is None:
+        return genv.utils.get_temp_file_path("locks/devices.lock")
+
+    return genv.utils.get_temp_file_path(f"locks/devices/{index}.lock")
+
+
+@contextmanager
+def _lock_shards(indices: Iterable[int]) -> None:
+    """
+    Locks the states of a few devices.
+
+    The lock of the entire devices state is locked in shared mode so that operations
+    on the entire state, which lock it exclusively, wait for these devices.
+    """
+    timeout = genv.utils.get_lock_timeout()
+
+    with ExitStack() as es:
+        es.enter_context(
+            genv.utils.access_lock(
+                _get_shards_lock_path(), shared=True, timeout=timeout
+            )
+        )
+
+        # we sort here to avoid deadlocks similarly to lock()
+        for index in sorted(set(indices)):
+            es.enter_context(
+                genv.utils.access_lock(_get_shards_lock_path(index), timeout=timeout)
+            )
+
+        yield
+
+
+def sharded() -> bool:
+    """
+    Returns whether devices are locked individually when attaching and detaching.
+    This is the case with state backends that can save different rows concurrently.
+    """
+    return State(cleanup=False).concurrent
+
+
+def attachment_lock() -> ContextManager:
+    """
+    Returns the lock to hold when attaching and detaching environments.
+    This is the global lock unless devices are sharded, as then they are locked individually.
+    """
+    return nullcontext() if sharded() else genv.utils.global_lock()
 
 
 def cleanup() -> None:
@@ -77,7 +154,8 @@ def cleanup() -> None:
 
 def snapshot() -> Devices:
     """
-    Returns an environments snapshot.
+    Returns a devices snapshot.
+    Does not require holding the global lock.
     """
     return State().load()
 
@@ -89,10 +167,14 @@ def attach(
     gpus: Optional[int] = None,
     gpu_memory: Optional[str] = None,
     allow_over_subscription: bool = False,
+    policy: Optional[str] = None,
 ) -> Iterable[int]:
     """Attaches an environment to devices.
 
     Does not detach devices if already attached to more devices.
+    Requires holding the attachment lock.
+
+    :param policy: Name of the allocation policy choosing devices by count; see 'genv.entities.core.allocation'
 
     :return: Attached device indices
     """
@@ -101,48 +183,107 @@ def attach(
             'Can\'t use both "gpus" and "index" in genv.core.devices.attach()'
         )
 
-    with State() as devices:
-        env_devices = devices.filter(eid=eid)
+    state = State()
 
-        if index is not None:
-            if index not in env_devices.indices:
-                if not allow_over_subscription and not devices[index].available(
-                    gpu_memory
-                ):
-                    raise RuntimeError(f"Device {index} is not available")
+    # the entire state is locked if not sharded or if it was not created yet
+    if not state.concurrent or state.generation == 0:
+        with state as devices:
+            return _attach(
+                devices, eid, index, gpus, gpu_memory, allow_over_subscription, policy
+            )
+
+    # devices are chosen using a snapshot and are then locked. the choice is made
+    # again after locking them in case they were taken by others concurrently.
+    attempts = 0
 
-                devices.attach(eid, index, gpu_memory)
-        elif gpus is not None:
-            diff = gpus - len(env_devices)
+    while True:
+        snapshot = state.load()
 
-            if diff > 0:
-                not_env_devices = devices.filter(not_indices=env_devices.indices)
+        indices = _attach(
+            snapshot, eid, index, gpus, gpu_memory, allow_over_subscription, policy
+        )
 
-                indices = not_env_devices.find_available_devices(
-                    diff, gpu_memory, allow_over_subscription
+        try:
+            with State(where={"index": indices}) as devices:
+                return _attach(
+                    devices,
+                    eid,
+                    index,
+                    gpus,
+                    gpu_memory,
+                    allow_over_subscription,
+                    policy,
                 )
+        except RuntimeError:
+            # every failed attempt means that another device was taken
+            attempts += 1
 
-                devices.attach(eid, indices, gpu_memory)
-            elif diff < 0:
-                pass  # TODO(raz): support detaching devices if already attached to more
+            if attempts > len(snapshot):
+                raise
 
-        return devices.filter(eid=eid).indices
+
+def _attach(
+    devices: Devices,
+    eid: str,
+    index: Optional[int],
+    gpus: Optional[int],
+    gpu_memory: Optional[str],
+    allow_over_subscription: bool,
+    policy: Optional[str] = None,
+) -> Iterable[int]:
+    """Attaches an environment to devices in a collection"""
+
+    env_devices = devices.filter(eid=eid)
+
+    if index is not None:
+        if index not in env_devices:
+            if not allow_over_subscription and not devices[index].available(gpu_memory):
+                raise RuntimeError(f"Device {index} is not available")
+
+            devices.attach(eid, index, gpu_memory)
+    elif gpus is not None:
+        diff = gpus - len(env_devices)
+
+        if diff > 0:
+            not_env_devices = devices.filter(not_indices=env_devices.indices)
+
+            indices = not_env_devices.find_available_devices(
+                diff, gpu_memory, allow_over_subscription, policy
+            )
+
+            devices.attach(eid, indices, gpu_memory)
+        elif diff < 0:
+            pass  # TODO(raz): support detaching devices if already attached to more
+
+    return devices.filter(eid=eid).indices
 
 
 def detach(eid: str, index: Optional[int] = None) -> Iterable[int]:
     """
     Detaches an environment from a device.
+    Requires holding the attachment lock.
     """
-    with State() as devices:
+    state = State()
+
+    where = None
+
+    if state.concurrent and state.generation != 0:
+        # only devices that the environment is attached to are locked
+        where = {"index": attached(eid) + ([index] if index is not None else [])}
+
+    with State(where=where) as devices:
         devices.detach(eid, index)
 
         return devices.filter(eid=eid).indices
 
 
 def attached(eid: str) -> Iterable[int]:
-    """Returns the indices of devices that are attached to an environment"""
+    """Returns the indices of devices that are attached to an environment.
+
+    Does not require holding the global lock.
+    """
 
-    devices = snapshot()
+    devices = State(where={"eid": eid}).load()
 
     return devices.filter(eid=eid).indices
 
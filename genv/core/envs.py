@@ -1,4 +1,4 @@
-from typing import Any, Optional, Union
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 
 import genv.utils
 from genv.entities import Env, Envs
@@ -8,16 +8,37 @@ from .utils import File
 
 
 class State(File[Envs]):
-    def __init__(self, cleanup: bool = True, reset: bool = False) -> None:
+    def __init__(
+        self,
+        cleanup: bool = True,
+        reset: bool = False,
+        *,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> None:
         super().__init__(
             genv.utils.get_temp_file_path("envs.json"),
             cleanup,
             reset,
+            where=where,
         )
 
     def _create(self):
         return Envs([])
 
+    def _split(self, envs: Envs) -> Dict[str, Env]:
+        return {env.eid: env for env in envs}
+
+    def _join(self, rows: Iterable[Env]) -> Envs:
+        return Envs(list(rows))
+
+    def _indices(self, env: Env) -> Iterable[Tuple[str, Any]]:
+        return [
+            ("eid", env.eid),
+            ("username", env.username),
+            *(("pid", pid) for pid in env.pids),
+            *(("kernel_id", kernel_id) for kernel_id in env.kernel_ids),
+        ]
+
     def _convert(self, o: Union[Any, Envs]) -> Envs:
         def _get_field(obj, field, cls, *args):
             return (
@@ -60,8 +81,9 @@ class State(File[Envs]):
 
         return o
 
-    def _clean(self, envs: Envs) -> None:
+    def _clean(self, envs: Envs, keys: Optional[Iterable[str]] = None) -> None:
         envs.cleanup(
+            eids=keys,
             poll_pid=genv.utils.poll.poll_pid,
             poll_kernel=genv.utils.poll.poll_jupyter_kernel,
         )
@@ -70,10 +92,31 @@ class State(File[Envs]):
 def snapshot() -> Envs:
     """
     Returns an environments snapshot.
+    Does not require holding the global lock.
     """
     return State().load()
 
 
+def _activate(
+    envs: Envs,
+    eid: str,
+    uid: int,
+    username: Optional[str],
+    pid: Optional[int],
+    kernel_id: Optional[str],
+) -> None:
+    """Activates an environment in a collection"""
+
+    if eid not in envs:
+        envs.activate(
+            eid=eid,
+            uid=uid,
+            username=username,
+        )
+
+    envs[eid].attach(pid=pid, kernel_id=kernel_id)
+
+
 def activate(
     eid: str,
     uid: int,
@@ -85,21 +128,17 @@ def activate(
     """
     Activates an environment if does not exist and attaches a proces or a Jupyter kernel to it.
     """
-    with State() as envs:
-        if eid not in envs:
-            envs.activate(
-                eid=eid,
-                uid=uid,
-                username=username,
-            )
-
-        envs[eid].attach(pid=pid, kernel_id=kernel_id)
+    with State(where={"eid": eid}) as envs:
+        _activate(envs, eid, uid, username, pid, kernel_id)
 
 
 def configuration(eid: str) -> Optional[Env.Config]:
-    """Returns the configuration of an environment if it exists"""
+    """Returns the configuration of an environment if it exists.
 
-    envs = snapshot()
+    Does not require holding the global lock.
+    """
+
+    envs = State(where={"eid": eid}).load()
 
     if eid in envs:
         return envs[eid].config
@@ -108,14 +147,21 @@ def configuration(eid: str) -> Optional[Env.Config]:
 def configure(eid: str, config: Env.Config) -> None:
     """Configures an environment"""
 
-    with State() as envs:
+    with State(where={"eid": eid}) as envs:
         envs[eid].config = config
 
 
 def deactivate(*, pid: Optional[int] = None, kernel_id: Optional[str] = None) -> None:
     """Detatches a process or a kernel and deactivates inactive environments"""
 
-    with State() as envs:
+    where = None
+
+    if pid:
+        where = {"pid": pid}
+    elif kernel_id:
+        where = {"kernel_id": kernel_id}
+
+    with State(where=where) as envs:
         envs.cleanup(
             poll_pid=(lambda pid_: pid_ != pid) if pid else None,
             poll_kernel=(lambda kernel_id_: kernel_id_ != kernel_id)
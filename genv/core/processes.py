@@ -1,24 +1,49 @@
 import asyncio
+from typing import Dict, Optional, Tuple
 
 from genv.entities import Process, Processes
 
-import genv.utils.nvidia_smi
+import genv.utils
+import genv.utils.drivers
 
 
-async def snapshot() -> Processes:
+async def snapshot(query: Optional[genv.utils.drivers.Query] = None) -> Processes:
     """
     Returns a snapshot of all running compute processes.
+
+    :param query: Devices and compute apps that were already queried
     """
-    uuids, apps = await asyncio.gather(
-        genv.utils.nvidia_smi.device_uuids(), genv.utils.nvidia_smi.compute_apps()
-    )
+    processes, _ = await _snapshot(query)
+
+    return processes
+
+
+async def _snapshot(
+    query: Optional[genv.utils.drivers.Query] = None,
+) -> Tuple[Processes, Dict[int, Optional[float]]]:
+    """
+    Returns a snapshot of all running compute processes and their start times.
+
+    Start times are read before the environments of the processes are resolved, so
+    a process whose identifier was reused after its start time was read has a
+    different start time now.
+    """
+    if query is None:
+        driver = genv.utils.drivers.get()
+        uuids, apps = await asyncio.gather(driver.device_uuids(), driver.compute_apps())
+    else:
+        uuids, apps = query.uuids, query.apps
 
     pid_to_apps = {
         pid: [app for app in apps if app["pid"] == pid]
         for pid in set(app["pid"] for app in apps)
     }
 
-    return Processes(
+    start_times = {
+        pid: genv.utils.get_process_start_time(pid) for pid in pid_to_apps.keys()
+    }
+
+    processes = Processes(
         [
             Process(
                 pid=pid,
@@ -33,3 +58,5 @@ async def snapshot() -> Processes:
             for pid, apps in pid_to_apps.items()
         ]
     )
+
+    return processes, start_times
@@ -1,17 +1,83 @@
-from genv.entities import Snapshot
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
 
+from genv.entities import Devices, Envs, Processes, Snapshot
+
+import genv.utils
+import genv.utils.drivers
 import genv.core.envs
 import genv.core.devices
 import genv.core.processes
 
 
-async def snapshot() -> Snapshot:
+def _load() -> Tuple[Envs, Devices]:
+    """Loads the environments and devices states."""
+    return genv.core.envs.snapshot(), genv.core.devices.snapshot()
+
+
+async def snapshot(query: Optional[genv.utils.drivers.Query] = None) -> Snapshot:
     """
     Returns a full system snapshot.
+
+    Compute processes are queried while the environments and devices states are
+    loaded in an executor. The global lock is locked in shared mode only for loading
+    the states, so that they are consistent with each other.
+
+    Processes that terminated meanwhile, or whose identifier was reused, are
+    identified by their start time and are not included. Start times are read
+    before the environments of processes are resolved and compared again after the
+    states are loaded. Processes whose start time cannot be read are included.
+    The durations of the stages are available in the snapshot timings.
+    Does not require holding the global lock.
+
+    :param query: Devices and compute apps that were already queried
     """
+    timings: Dict[str, float] = {}
+
+    async def query_processes():
+        start = time.monotonic()
+        processes, start_times = await genv.core.processes._snapshot(query)
+
+        timings["processes"] = time.monotonic() - start
+
+        return processes, start_times
+
+    async def load_states():
+        start = time.monotonic()
+
+        async with genv.utils.aglobal_lock(shared=True):
+            locked = time.monotonic()
+            timings["lock"] = locked - start
+
+            envs, devices = await asyncio.get_running_loop().run_in_executor(
+                None, _load
+            )
+
+            timings["states"] = time.monotonic() - locked
+
+        return envs, devices
+
+    start = time.monotonic()
+
+    (processes, start_times), (envs, devices) = await asyncio.gather(
+        query_processes(), load_states()
+    )
+
+    # processes whose start time could not be read (e.g. in other pid namespaces) are kept
+    processes = Processes(
+        [
+            process
+            for process in processes
+            if start_times[process.pid] is None
+            or genv.utils.get_process_start_time(process.pid)
+            == start_times[process.pid]
+        ]
+    )
+
+    timings["total"] = time.monotonic() - start
 
-    processes = await genv.core.processes.snapshot()
-    envs = genv.core.envs.snapshot()
-    devices = genv.core.devices.snapshot()
+    snapshot = Snapshot(processes, envs, devices)
+    snapshot.timings.update(timings)
 
-    return Snapshot(processes, envs, devices)
+    return snapshot
@@ -0,0 +1,105 @@
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+from genv.entities import Devices, Env, Envs
+
+import genv.core.envs
+import genv.core.devices
+
+
+class Transaction:
+    """
+    Environments and devices that are loaded, cleaned up and saved together.
+    """
+
+    def __init__(self, envs: Envs, devices: Devices) -> None:
+        self.envs = envs
+        self.devices = devices
+
+    def activate(
+        self,
+        eid: str,
+        uid: int,
+        username: Optional[str] = None,
+        *,
+        pid: Optional[int] = None,
+        kernel_id: Optional[str] = None,
+    ) -> None:
+        """
+        Activates an environment if does not exist and attaches a proces or a Jupyter kernel to it.
+        """
+        genv.core.envs._activate(self.envs, eid, uid, username, pid, kernel_id)
+
+    def configure(self, eid: str, config: Env.Config) -> None:
+        """Configures an environment"""
+
+        self.envs[eid].config = config
+
+    def attach(
+        self,
+        eid: str,
+        *,
+        index: Optional[int] = None,
+        gpus: Optional[int] = None,
+        gpu_memory: Optional[str] = None,
+        allow_over_subscription: bool = False,
+        policy: Optional[str] = None,
+    ) -> Iterable[int]:
+        """Attaches an environment to devices.
+
+        Does not detach devices if already attached to more devices.
+
+        :param policy: Name of the allocation policy choosing devices by count
+
+        :return: Attached device indices
+        """
+        if gpus is not None and index is not None:
+            raise ValueError(
+                'Can\'t use both "gpus" and "index" in genv.core.Transaction.attach()'
+            )
+
+        return genv.core.devices._attach(
+            self.devices,
+            eid,
+            index,
+            gpus,
+            gpu_memory,
+            allow_over_subscription,
+            policy,
+        )
+
+    def attached(self, eid: str) -> Iterable[int]:
+        """Returns the indices of devices that are attached to an environment."""
+
+        return self.devices.filter(eid=eid).indices
+
+
+@contextmanager
+def transaction() -> Iterator[Transaction]:
+    """
+    Loads the environments and devices states once and saves the changed ones if no
+    exception was raised.
+
+    With the SQLite state backend, both states are committed in a single database
+    transaction. Other backends save the states one after the other, devices first, so
+    failing in between can only leave devices attached to environments that were not
+    saved. Such attachments are detached by the next cleanup.
+
+    Requires holding the global lock.
+    """
+    envs_state = genv.core.envs.State()
+    devices_state = genv.core.devices.State(cleanup=False)
+
+    with devices_state.lock():
+        envs = envs_state.load()
+        devices = devices_state.load()
+
+        # devices are cleaned up using the loaded environments rather than loading them again
+        eids = set(envs.eids)
+        devices.cleanup(poll_eid=lambda eid: eid in eids)
+
+        yield Transaction(envs, devices)
+
+        with devices_state.atomic():
+            devices_state.commit()
+            envs_state.commit()
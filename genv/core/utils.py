@@ -1,20 +1,63 @@
 from abc import ABC, abstractmethod
-from typing import Any, Generic, TypeVar, Union
+from contextlib import ExitStack, nullcontext
+import os
+import time
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Generic,
+    Iterable,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import genv.utils
 
+from . import backends
+
 T = TypeVar("T")
 
 
+def _cleanup_interval() -> float:
+    """Returns the minimal interval in seconds between full cleanups of a state."""
+    return float(os.environ.get("GENV_CLEANUP_INTERVAL", 5))
+
+
 class File(Generic[T], ABC):
     """
     A state file on disk.
     """
 
-    def __init__(self, path: str, cleanup: bool = True, reset: bool = False) -> None:
+    # whether full cleanups are done at most once in a cleanup interval
+    _rate_limited = True
+
+    def __init__(
+        self,
+        path: str,
+        cleanup: bool = True,
+        reset: bool = False,
+        *,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        :param where: Index values of the rows to load, or lists of them; this is only a hint for backends that support loading single rows and more rows may be loaded
+        """
         self._path = path
         self._cleanup = cleanup
         self._reset = reset
+        self._where = where
+        self._keys = None
+        self._swept = False
+        self._schema = backends.Schema(
+            split=self._split,
+            join=self._join,
+            indices=self._indices,
+            convert=self._convert,
+        )
+        self._backend = backends.create(path, self._schema)
 
     @abstractmethod
     def _create(self) -> T:
@@ -22,38 +65,163 @@ class File(Generic[T], ABC):
         pass
 
     @abstractmethod
-    def _clean(self, state: T) -> None:
-        """Cleans up state."""
+    def _clean(self, state: T, keys: Optional[Iterable[str]] = None) -> None:
+        """
+        Cleans up state.
+
+        :param keys: Keys of the rows to clean up; all rows if not passed
+        """
         pass
 
     def _convert(self, o: Union[Any, T]) -> T:
         """Converts the loaded object if needed."""
         return o
 
+    @abstractmethod
+    def _split(self, state: T) -> Dict[str, Any]:
+        """Returns the rows of a state by their keys."""
+        pass
+
+    @abstractmethod
+    def _join(self, rows: Iterable[Any]) -> T:
+        """Assembles a state from rows."""
+        pass
+
+    def _indices(self, row: Any) -> Iterable[Tuple[str, Any]]:
+        """Returns the (name, value) index entries of a row."""
+        return []
+
+    def _matching(self, state: T) -> Iterable[str]:
+        """Returns the keys of the rows that match the index values of this file."""
+        return [
+            key
+            for key, row in self._split(state).items()
+            if all(
+                any(
+                    (field, value) in self._indices(row)
+                    for value in (values if isinstance(values, list) else [values])
+                )
+                for field, values in self._where.items()
+            )
+        ]
+
+    def _sweep(self, state: T) -> None:
+        """
+        Cleans up state.
+
+        If rate limited, a full cleanup is done only if enough time passed since the
+        previous one. Otherwise, only rows that match the index values of this file are cleaned up.
+        A full cleanup is recorded only when the state is committed, so loading never writes.
+        """
+        if not self._rate_limited:
+            self._clean(state)
+        elif time.time() - self._backend.cleaned() >= _cleanup_interval():
+            self._clean(state)
+            self._swept = True
+        elif self._where:
+            self._clean(state, self._matching(state))
+
+    def _import(self) -> Optional[T]:
+        """Imports the state from its JSON file if exists."""
+        return backends.JSON(self._path, self._schema).load()
+
+    @property
+    def concurrent(self) -> bool:
+        """Returns whether different rows can be saved concurrently."""
+        return self._backend.concurrent
+
+    @property
+    def generation(self) -> int:
+        """Returns the generation of the state on disk."""
+        return self._backend.generation()
+
     def load(self) -> T:
-        """Loads state from disk."""
-        self._state = genv.utils.load_state(
-            self._path,
-            creator=self._create,
-            cleaner=self._clean,
-            converter=self._convert,
-            json_decoder=genv.serialization.JSONDecoder,
-            cleanup=self._cleanup,
-            reset=self._reset,
-        )
+        """
+        Loads state from disk.
+        Does not require holding the global lock if the state is not saved afterwards.
+        """
+        self._keys = None
+        self._swept = False
+
+        o = None
+
+        if not self._reset:
+            o = self._backend.load(self._where)
+
+            if o is not None:
+                converted = self._convert(o)
+
+                # states that were converted from older formats are saved as if they were changed
+                if converted is o:
+                    o.mark_clean()
+
+                o = converted
+
+                if self._backend.rows:
+                    self._keys = list(self._split(o).keys())
+            elif self._backend.rows:
+                # the state was not saved using this backend yet so we import it
+                # from its JSON file and save it entirely on the next save
+                o = self._import()
+
+                if o is not None:
+                    o = self._convert(o)
+
+        if o is not None:
+            if self._cleanup:
+                self._sweep(o)
+        else:
+            o = self._create()
+
+        self._state = o
 
         return self._state
 
     def save(self) -> None:
         """Saves state to disk."""
-        genv.utils.save_state(
-            self._state,
-            self._path,
-            json_encoder=genv.serialization.JSONEncoder,
-        )
+        self._backend.save(self._state, self._keys)
+
+        if self._swept:
+            self._backend.mark_cleaned()
+            self._swept = False
+
+    def atomic(self) -> ContextManager:
+        """
+        Returns a context in which saves of this and other states are committed together
+        if supported by the backend. Otherwise, every state is saved on its own.
+        """
+        return self._backend.atomic()
+
+    def lock(self) -> ContextManager:
+        """
+        Returns a lock over the rows of this file.
+        Nothing is locked by default as states are protected by the global lock.
+        """
+        return nullcontext()
 
     def __enter__(self) -> T:
-        return self.load()
+        with ExitStack() as stack:
+            stack.enter_context(self.lock())
+            self.load()
+            self._locked = stack.pop_all()
+
+        return self._state
+
+    def commit(self) -> None:
+        """Saves state to disk if it was changed since loaded."""
+        name = os.path.basename(self._path)
+
+        if self._state.dirty:
+            self.save()
+            genv.utils.statistics.increment("state_writes_performed", name)
+        else:
+            # a full cleanup that changed nothing is recorded without saving
+            if self._swept:
+                self._backend.mark_cleaned()
+                self._swept = False
+
+            genv.utils.statistics.increment("state_writes_skipped", name)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.save()
+        with self._locked:
+            self.commit()
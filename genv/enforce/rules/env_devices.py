@@ -6,10 +6,13 @@ def env_devices(*surveys: Survey) -> None:
     Terminates processes on devices not attached to their environments.
     """
     for survey in surveys:
+        env_snapshots = survey.snapshot.group_by("eid")
+
         for env in survey.snapshot.envs:
-            allowed = survey.snapshot.devices.filter(eid=env.eid).indices
+            env_snapshot = env_snapshots[env.eid]
+            allowed = env_snapshot.devices.indices
 
-            for process in survey.snapshot.processes.filter(eid=env.eid):
+            for process in env_snapshot.processes:
                 unallowed = [index for index in process.indices if index not in allowed]
 
                 if len(unallowed) == 0:
@@ -1,4 +1,4 @@
-from genv.utils import memory_to_bytes, bytes_to_memory
+from genv.utils import Memory
 
 from genv.entities.enforce import Survey
 
@@ -8,25 +8,28 @@ def env_memory(*surveys: Survey) -> None:
     Terminates processes from environments that exceed their memory capacity.
     """
     for survey in surveys:
+        env_snapshots = survey.snapshot.group_by("eid")
+
         for env in survey.snapshot.envs:
             if env.config.gpu_memory is None:
                 continue
 
-            for device in survey.snapshot.devices.filter(eid=env.eid):
-                processes = survey.snapshot.processes.filter(
-                    eid=env.eid, index=device.index
-                )
+            capacity = Memory(env.config.gpu_memory)
+            env_snapshot = env_snapshots[env.eid]
+
+            for device in env_snapshot.devices:
+                processes = env_snapshot.processes.filter(index=device.index)
 
                 used_bytes = sum(process.total_bytes for process in processes)
 
-                over_bytes = used_bytes - memory_to_bytes(env.config.gpu_memory)
+                over_bytes = used_bytes - capacity.bytes
 
                 if not over_bytes > 0:
                     continue
 
                 print(
                     f"{f'[{survey.hostname}] ' if survey.hostname else ''}"
-                    f"Environment {env.eid} is using {bytes_to_memory(used_bytes, 'm')} on device {device.index} which is {bytes_to_memory(over_bytes, 'm')} over its capacity of {env.config.gpu_memory}"
+                    f"Environment {env.eid} is using {Memory(used_bytes).to('m')} on device {device.index} which is {Memory(over_bytes).to('m')} over its capacity of {env.config.gpu_memory}"
                 )
 
                 freed_bytes = 0
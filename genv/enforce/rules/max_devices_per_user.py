@@ -1,5 +1,6 @@
 from typing import Dict
 
+from genv.entities import Devices, Envs, Processes, Snapshot
 from genv.entities.enforce import Survey
 
 
@@ -9,15 +10,12 @@ def max_devices_per_user(
     """
     Enforce maximum devices per user.
     """
-    usernames = set(
-        env.username
-        for survey in surveys
-        for env in survey.snapshot.envs
-        if env.username
-    )
+    user_snapshots = [survey.snapshot.group_by("username") for survey in surveys]
+    usernames = set(username for groups in user_snapshots for username in groups)
+    empty = Snapshot(processes=Processes([]), envs=Envs([]), devices=Devices([]))
 
     for username in usernames:
-        snapshots = [survey.snapshot.filter(username=username) for survey in surveys]
+        snapshots = [groups.get(username, empty) for groups in user_snapshots]
 
         attached = sum(len(snapshot.devices) for snapshot in snapshots)
 
@@ -0,0 +1,126 @@
+from abc import ABC, abstractmethod
+import os
+from typing import Dict, Iterable, List, Optional
+
+from genv.utils import Memory
+
+from .devices import Device
+
+# names of the built-in policies
+FIRST_FIT = "first-fit"
+BEST_FIT = "best-fit"
+WORST_FIT = "worst-fit"
+
+
+class Policy(ABC):
+    """
+    An allocation policy that chooses devices for a request.
+
+    A request is placed as a whole (gang placement): the policy gets all devices on
+    which the request fits and returns all devices to use at once, so it can weigh
+    combinations of devices rather than single devices.
+    """
+
+    @abstractmethod
+    def place(
+        self, devices: Iterable[Device], count: int, gpu_memory: Optional[Memory]
+    ) -> List[int]:
+        """
+        Chooses devices for a request.
+
+        :param devices: Devices on which the request fits
+        :param count: Amount of devices requested
+        :param gpu_memory: Memory requested on every device; entire devices are requested if not specified
+        :return: Indices of the devices to use; fewer than requested if there are not enough devices
+        """
+        raise NotImplementedError("This should be implemented in subclasses")
+
+
+class FirstFit(Policy):
+    """
+    Uses devices by their order in the collection.
+    """
+
+    def place(
+        self, devices: Iterable[Device], count: int, gpu_memory: Optional[Memory]
+    ) -> List[int]:
+        return [device.index for device in devices][:count]
+
+
+class BestFit(Policy):
+    """
+    Uses the devices with the least available memory, so that large blocks of memory
+    are kept for large requests.
+
+    Devices are compared only by their available memory as this is the only information
+    about them. The devices with the least available memory are then also the
+    combination that leaves the least memory unused on the chosen devices, as well as
+    the most entirely free devices and the largest free blocks on other devices.
+    Ties are broken by the device index.
+    """
+
+    def place(
+        self, devices: Iterable[Device], count: int, gpu_memory: Optional[Memory]
+    ) -> List[int]:
+        return [
+            device.index
+            for device in sorted(
+                devices,
+                key=lambda device: (device.available_memory_bytes, device.index),
+            )
+        ][:count]
+
+
+class WorstFit(Policy):
+    """
+    Uses the devices with the most available memory, so that load is spread across
+    devices and every chosen device keeps as much free memory as possible.
+    Ties are broken by the device index.
+    """
+
+    def place(
+        self, devices: Iterable[Device], count: int, gpu_memory: Optional[Memory]
+    ) -> List[int]:
+        return [
+            device.index
+            for device in sorted(
+                devices,
+                key=lambda device: (-device.available_memory_bytes, device.index),
+            )
+        ][:count]
+
+
+_policies: Dict[str, Policy] = {
+    FIRST_FIT: FirstFit(),
+    BEST_FIT: BestFit(),
+    WORST_FIT: WorstFit(),
+}
+
+
+def register(name: str, policy: Policy) -> None:
+    """
+    Registers an allocation policy under a name.
+    Replaces the policy that is registered under this name if there is one.
+    """
+    _policies[name] = policy
+
+
+def names() -> Iterable[str]:
+    """Returns the names of the registered allocation policies."""
+    return list(_policies.keys())
+
+
+def get(name: Optional[str] = None) -> Policy:
+    """
+    Returns the allocation policy with the given name, or the one configured by
+    the environment variable "GENV_ALLOCATION_POLICY" if no name is given.
+
+    Raises 'RuntimeError' if no such policy is registered.
+    """
+    if name is None:
+        name = os.environ.get("GENV_ALLOCATION_POLICY", FIRST_FIT)
+
+    if name not in _policies:
+        raise RuntimeError(f"Unsupported allocation policy '{name}'")
+
+    return _policies[name]
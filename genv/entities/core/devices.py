@@ -1,22 +1,38 @@
 from dataclasses import dataclass
-from datetime import datetime
 from typing import Callable, Iterable, Optional, Union
 
-from genv.utils import DATETIME_FMT, memory_to_bytes
+from genv.utils import Memory, Timestamp
 
+from .index import LazyIndex
+from .slots import slotted
+from .tracked import Tracked
 
+
+@slotted
 @dataclass
-class Device:
+class Device(Tracked):
+    @slotted
     @dataclass
     class Attachement:
         eid: str
-        gpu_memory: Optional[str]
-        time: str
+        gpu_memory: Optional[Memory]
+        time: Timestamp
+
+        def __post_init__(self) -> None:
+            if self.gpu_memory is not None:
+                self.gpu_memory = Memory(self.gpu_memory)
+
+            self.time = Timestamp(self.time)
 
     index: int
-    total_memory: str
+    total_memory: Memory
     attachments: Iterable[Attachement]
 
+    def __post_init__(self) -> None:
+        # the device is only being created so it is not marked as changed
+        object.__setattr__(self, "total_memory", Memory(self.total_memory))
+        object.__setattr__(self, "attachments", tuple(self.attachments))
+
     @property
     def eids(self) -> Iterable[str]:
         return [attachment.eid for attachment in self.attachments]
@@ -34,23 +50,21 @@ class Device:
         """
         Returns the device total memory in bytes.
         """
-        return memory_to_bytes(self.total_memory)
+        return self.total_memory.bytes
 
     @property
     def available_memory_bytes(self) -> int:
         """
         Returns the device available memory in bytes.
         """
-        available_bytes = memory_to_bytes(self.total_memory)
+        available_bytes = self.total_memory.bytes
 
         for attachment in self.attachments:
-            available_bytes -= memory_to_bytes(
-                attachment.gpu_memory or self.total_memory
-            )
+            available_bytes -= (attachment.gpu_memory or self.total_memory).bytes
 
         return max(available_bytes, 0)
 
-    def available(self, gpu_memory: Optional[str]) -> bool:
+    def available(self, gpu_memory: Optional[Union[Memory, str]]) -> bool:
         """
         Returns is the device is available with respect to the given memory specification.
         If memory is specified, checks if this amount is available.
@@ -59,41 +73,89 @@ class Device:
         if gpu_memory is None:
             return self.detached
 
-        return self.available_memory_bytes >= memory_to_bytes(gpu_memory)
+        return self.available_memory_bytes >= Memory(gpu_memory).bytes
 
     def filter(self, *, eids: Iterable[str]):
         """
-        Returns a new device with only the given environment identifiers.
+        Returns a device with only the given environment identifiers.
+        Returns this device itself if all of its environments are kept.
         """
-        return Device(
-            self.index,
-            self.total_memory,
-            [attachment for attachment in self.attachments if attachment.eid in eids],
-        )
+        attachments = [
+            attachment for attachment in self.attachments if attachment.eid in eids
+        ]
 
-    def attach(self, eid: str, gpu_memory: Optional[str], time: str) -> None:
+        if len(attachments) == len(self.attachments):
+            return self
+
+        return Device(self.index, self.total_memory, attachments)
+
+    def attach(
+        self, eid: str, gpu_memory: Optional[str], time: Union[Timestamp, str]
+    ) -> None:
         """
         Attaches an environment.
         """
-        self.attachments.append(Device.Attachement(eid, gpu_memory, time))
+        self.attachments = (
+            *self.attachments,
+            Device.Attachement(eid, gpu_memory, time),
+        )
 
     def detach(self, eid: str) -> None:
         """
         Detaches an environment.
         """
-        for index, attachment in enumerate(self.attachments):
-            if attachment.eid == eid:
-                del self.attachments[index]
+        attachments = tuple(
+            attachment for attachment in self.attachments if attachment.eid != eid
+        )
+
+        if len(attachments) != len(self.attachments):
+            self.attachments = attachments
 
 
 @dataclass
-class Devices:
+class Devices(Tracked):
     """
     A collection of devices.
     """
 
     devices: Iterable[Device]
 
+    _indices = LazyIndex("index")
+    _eids = LazyIndex("eids", many=True, mutable=True)
+
+    # whether the devices are shared with another collection (e.g. this was filtered from it)
+    _shared = False
+
+    @classmethod
+    def _view(cls, devices: Iterable[Device]) -> "Devices":
+        """Returns a collection of devices that are shared with another collection."""
+        view = cls(devices)
+        view._shared = True
+
+        return view
+
+    def _own(self) -> None:
+        """
+        Copies the devices if they are shared with another collection before they are changed.
+        This makes changes through filtered collections copy-on-write.
+        """
+        if self._shared:
+            self.devices = [
+                Device(device.index, device.total_memory, device.attachments)
+                for device in self.devices
+            ]
+            self._shared = False
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty or any(device.dirty for device in self.devices)
+
+    def mark_clean(self) -> None:
+        super().mark_clean()
+
+        for device in self.devices:
+            device.mark_clean()
+
     @property
     def indices(self) -> Iterable[int]:
         return [device.index for device in self.devices]
@@ -105,10 +167,15 @@ class Devices:
         return self.devices.__len__()
 
     def __getitem__(self, index: int) -> Device:
-        return next(device for device in self.devices if device.index == index)
+        devices = self._indices.get(self.devices, index)
+
+        if not devices:
+            raise KeyError(index)
+
+        return devices[0]
 
     def __contains__(self, index: int) -> bool:
-        return index in self.indices
+        return self._indices.contains(self.devices, index)
 
     def filter(
         self,
@@ -123,6 +190,9 @@ class Devices:
     ):
         """
         Returns a new filtered collection.
+        Devices are shared with this collection if they are kept as is. They are copied
+        when changed using methods of the returned collection, so that this collection
+        is not changed.
 
         :param deep: Perform deep filtering
         :param indices: Device indices to keep
@@ -143,22 +213,20 @@ class Devices:
 
         devices = self.devices
 
+        if eids is not None:
+            devices = self._eids.select(self.devices, eids)
+
+            if deep:
+                devices = [device.filter(eids=eids) for device in devices]
+
         if indices is not None:
+            indices = set(indices)
             devices = [device for device in devices if device.index in indices]
 
         if not_indices is not None:
+            not_indices = set(not_indices)
             devices = [device for device in devices if device.index not in not_indices]
 
-        if eids is not None:
-            if deep:
-                devices = [device.filter(eids=eids) for device in devices]
-
-            devices = [
-                device
-                for device in devices
-                if any((eid in eids) for eid in device.eids)
-            ]
-
         if attached is not None:
             if attached:
                 devices = [device for device in devices if device.attached]
@@ -168,7 +236,7 @@ class Devices:
         if function is not None:
             devices = [device for device in devices if function(device)]
 
-        return Devices(devices)
+        return Devices._view(devices)
 
     def attach(
         self, eid: str, indices: Union[Iterable[int], int], gpu_memory: Optional[str]
@@ -180,16 +248,20 @@ class Devices:
         if isinstance(indices, int):
             indices = [indices]
 
-        time = datetime.now().strftime(DATETIME_FMT)
+        self._own()
+
+        time = Timestamp.now()
 
         for index in indices:
-            self.devices[index].attach(eid, gpu_memory, time)
+            self[index].attach(eid, gpu_memory, time)
 
     def detach(self, eid: str, index: Optional[int] = None) -> None:
         """Detaches an environment"""
 
+        self._own()
+
         if index is not None:
-            self.devices[index].detach(eid)
+            self[index].detach(eid)
         else:
             for device in self.devices:
                 device.detach(eid)
@@ -202,30 +274,45 @@ class Devices:
         """
         Cleans up the collection in place.
         """
+        self._own()
+
         for device in self.devices:
             for eid in device.eids:
                 if (poll_eid is not None) and (not poll_eid(eid)):
                     device.detach(eid)
 
     def find_available_devices(
-        self, count: int, gpu_memory: Optional[str], allow_over_subscription: bool
+        self,
+        count: int,
+        gpu_memory: Optional[str],
+        allow_over_subscription: bool,
+        policy: Optional[str] = None,
     ) -> Iterable[int]:
         """
         Finds available devices with respect to the optionally specified memory request.
         When thare are not enough devices available, non available devices are also used if
         over-subscription is allowed. Otherwise, RuntimeError is raised.
+        All devices are found at once so that either all of them are used or none.
 
         :param count: Amount of devices to find
         :param gpu_memory: Optional memory request
         :param allow_over_subscription: Use non available devices if needed
+        :param policy: Name of the allocation policy choosing among available devices; see 'allocation.names()'
 
         :return: A list of device indices
         """
+        from . import allocation
+
+        policy = allocation.get(policy)
+
+        if gpu_memory is not None:
+            gpu_memory = Memory(gpu_memory)
+
         available_devices = self.filter(
             function=lambda device: device.available(gpu_memory)
         )
 
-        indices = available_devices.indices
+        indices = list(policy.place(available_devices, count, gpu_memory))
 
         if allow_over_subscription and len(indices) < count:
             not_available_devices = self.filter(not_indices=available_devices.indices)
@@ -233,7 +320,7 @@ class Devices:
             # we sort in order to use the least populated devices first
             indices += sorted(
                 not_available_devices.indices,
-                key=lambda index: len(self[index].eids),
+                key=lambda index: (len(self[index].eids), index),
             )
 
         if len(indices) < count:
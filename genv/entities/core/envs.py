@@ -1,19 +1,31 @@
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Iterable, Optional, Type, Union
 
 import genv.utils
 
+from .index import LazyIndex
+from .slots import slotted
+from .tracked import Tracked
 
+
+@slotted
 @dataclass
-class Env:
+class Env(Tracked):
+    @slotted
     @dataclass
-    class Config:
+    class Config(Tracked):
         name: Optional[str] = None
-        gpu_memory: Optional[str] = None
+        gpu_memory: Optional[genv.utils.Memory] = None
         gpus: Optional[int] = None
 
+        def __post_init__(self) -> None:
+            # the config is only being created so it is not marked as changed
+            if self.gpu_memory is not None:
+                object.__setattr__(
+                    self, "gpu_memory", genv.utils.Memory(self.gpu_memory)
+                )
+
         def load(self, path: Union[str, Path]) -> None:
             """Loads from disk"""
 
@@ -24,7 +36,7 @@ class Env:
                     return type(file.read_text().strip())
 
             self.name = _load_field("name")
-            self.gpu_memory = _load_field("gpu-memory")
+            self.gpu_memory = _load_field("gpu-memory", genv.utils.Memory)
             self.gpus = _load_field("gpus", int)
 
         def save(self, path: Union[str, Path]) -> None:
@@ -44,12 +56,26 @@ class Env:
 
     eid: str
     uid: int
-    creation: str
+    creation: genv.utils.Timestamp
     username: Optional[str]
     config: Config
     pids: Iterable[int]
     kernel_ids: Iterable[str]
 
+    def __post_init__(self) -> None:
+        # the environment is only being created so it is not marked as changed
+        object.__setattr__(self, "creation", genv.utils.Timestamp(self.creation))
+        object.__setattr__(self, "pids", tuple(self.pids))
+        object.__setattr__(self, "kernel_ids", tuple(self.kernel_ids))
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty or self.config.dirty
+
+    def mark_clean(self) -> None:
+        super().mark_clean()
+        self.config.mark_clean()
+
     @property
     def time_since(self) -> str:
         return genv.utils.time_since(self.creation)
@@ -71,12 +97,18 @@ class Env:
         Cleans up in place.
         """
         if poll_pid is not None:
-            self.pids = [pid for pid in self.pids if poll_pid(pid)]
+            pids = tuple(pid for pid in self.pids if poll_pid(pid))
+
+            if len(pids) != len(self.pids):
+                self.pids = pids
 
         if poll_kernel is not None:
-            self.kernel_ids = [
+            kernel_ids = tuple(
                 kernel_id for kernel_id in self.kernel_ids if poll_kernel(kernel_id)
-            ]
+            )
+
+            if len(kernel_ids) != len(self.kernel_ids):
+                self.kernel_ids = kernel_ids
 
     def attach(
         self, *, pid: Optional[int] = None, kernel_id: Optional[str] = None
@@ -85,27 +117,42 @@ class Env:
         Attaches a process or a Jupyter kernel to an environment.
         """
         if pid is not None:
-            self.pids.append(pid)
+            self.pids = (*self.pids, pid)
 
         if kernel_id is not None:
-            self.kernel_ids.append(kernel_id)
+            self.kernel_ids = (*self.kernel_ids, kernel_id)
 
 
 @dataclass
-class Envs:
+class Envs(Tracked):
     """
     A collection of environments.
     """
 
     envs: Iterable[Env]
 
+    _eids = LazyIndex("eid")
+    _usernames = LazyIndex("username")
+    _pids = LazyIndex("pids", many=True, mutable=True)
+    _kernel_ids = LazyIndex("kernel_ids", many=True, mutable=True)
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty or any(env.dirty for env in self.envs)
+
+    def mark_clean(self) -> None:
+        super().mark_clean()
+
+        for env in self.envs:
+            env.mark_clean()
+
     @property
     def eids(self) -> Iterable[str]:
         return [env.eid for env in self.envs]
 
     @property
     def usernames(self) -> Iterable[str]:
-        return set(env.username for env in self.envs if env.username)
+        return set(username for username in self._usernames.keys(self.envs) if username)
 
     def __iter__(self):
         return self.envs.__iter__()
@@ -114,10 +161,15 @@ class Envs:
         return self.envs.__len__()
 
     def __getitem__(self, eid: str) -> Env:
-        return next(env for env in self.envs if env.eid == eid)
+        envs = self._eids.get(self.envs, eid)
+
+        if not envs:
+            raise KeyError(eid)
+
+        return envs[0]
 
     def __contains__(self, eid: str) -> bool:
-        return any(env.eid == eid for env in self.envs)
+        return self._eids.contains(self.envs, eid)
 
     def activate(
         self,
@@ -132,13 +184,14 @@ class Envs:
             Env(
                 eid=eid,
                 uid=uid,
-                creation=datetime.now().strftime(genv.utils.DATETIME_FMT),
+                creation=genv.utils.Timestamp.now(),
                 username=username,
                 config=Env.Config(name=None, gpu_memory=None, gpus=None),
-                pids=[],
-                kernel_ids=[],
+                pids=(),
+                kernel_ids=(),
             )
         )
+        self._touch()
 
     def filter(
         self,
@@ -169,10 +222,14 @@ class Envs:
         envs = self.envs
 
         if eids is not None:
-            envs = [env for env in envs if env.eid in eids]
+            envs = self._eids.select(self.envs, eids)
 
         if username is not None:
-            envs = [env for env in envs if env.username == username]
+            envs = (
+                self._usernames.get(self.envs, username)
+                if eids is None
+                else [env for env in envs if env.username == username]
+            )
 
         if name is not None:
             envs = [env for env in envs if env.config.name == name]
@@ -207,7 +264,10 @@ class Envs:
 
             env.cleanup(poll_pid=poll_pid, poll_kernel=poll_kernel)
 
-        self.envs = [env for env in self.envs if env.active]
+        envs = [env for env in self.envs if env.active]
+
+        if len(envs) != len(self.envs):
+            self.envs = envs
 
     def find(
         self, *, pid: Optional[int] = None, kernel_id: Optional[str] = None
@@ -216,13 +276,14 @@ class Envs:
         Returns the environments of the given process or kernel.
         """
 
-        def _pred(env: Env) -> bool:
-            if (pid is not None) and (pid in env.pids):
-                return True
+        envs = {}
 
-            if (kernel_id is not None) and (kernel_id in env.kernel_ids):
-                return True
+        if pid is not None:
+            envs.update((env.eid, env) for env in self._pids.get(self.envs, pid))
 
-            return False
+        if kernel_id is not None:
+            envs.update(
+                (env.eid, env) for env in self._kernel_ids.get(self.envs, kernel_id)
+            )
 
-        return [env for env in self.envs if _pred(env)]
+        return list(envs.values())
@@ -0,0 +1,125 @@
+from collections import defaultdict
+from typing import Any, Dict, Generic, Iterable, List, Optional, TypeVar
+
+from . import tracked
+
+K = TypeVar("K")
+T = TypeVar("T")
+
+
+class Index(Generic[K, T]):
+    """
+    An index of the entities of a collection by their keys.
+
+    The index is built on first use and is rebuilt if the list of entities is replaced
+    or its length changes. Indexes of keys that are changed in place (e.g. the processes
+    of an environment) are also rebuilt if any tracked entity was changed.
+    """
+
+    __slots__ = (
+        "_name",
+        "_many",
+        "_mutable",
+        "_items",
+        "_length",
+        "_changes",
+        "_entries",
+        "_positions",
+    )
+
+    def __init__(self, name: str, many: bool = False, mutable: bool = False) -> None:
+        """
+        :param name: Name of the attribute of entities to index by
+        :param many: Whether the attribute is a list of keys rather than a single key
+        :param mutable: Whether the attribute is changed in place
+        """
+        self._name = name
+        self._many = many
+        self._mutable = mutable
+        self._items: Optional[List[T]] = None
+        self._length = 0
+        self._changes = 0
+        self._entries: Dict[K, List[T]] = {}
+        self._positions: Dict[int, int] = {}
+
+    def __reduce__(self):
+        # the index is not pickled (e.g. when states are cached) and is rebuilt when used
+        return Index, (self._name, self._many, self._mutable)
+
+    def _update(self, items: List[T]) -> None:
+        """Rebuilds the index if it is stale."""
+        changes = tracked.changes() if self._mutable else 0
+
+        if (
+            items is self._items
+            and len(items) == self._length
+            and changes == self._changes
+        ):
+            return
+
+        entries = defaultdict(list)
+        positions = {}
+
+        for position, item in enumerate(items):
+            positions[id(item)] = position
+
+            keys = getattr(item, self._name)
+
+            for key in dict.fromkeys(keys) if self._many else [keys]:
+                entries[key].append(item)
+
+        self._items = items
+        self._length = len(items)
+        self._changes = changes
+        self._entries = dict(entries)
+        self._positions = positions
+
+    def keys(self, items: List[T]) -> Iterable[K]:
+        """Returns the keys of all entities."""
+        self._update(items)
+
+        return self._entries.keys()
+
+    def contains(self, items: List[T], key: K) -> bool:
+        """Returns whether any entity has the given key."""
+        self._update(items)
+
+        return key in self._entries
+
+    def get(self, items: List[T], key: K) -> List[T]:
+        """Returns the entities with the given key in their order in the collection."""
+        self._update(items)
+
+        return list(self._entries.get(key, []))
+
+    def select(self, items: List[T], keys: Iterable[K]) -> List[T]:
+        """Returns the entities with any of the given keys in their order in the collection."""
+        self._update(items)
+
+        found = {id(item): item for key in keys for item in self._entries.get(key, [])}
+
+        return [found[id_] for id_ in sorted(found, key=self._positions.__getitem__)]
+
+
+class LazyIndex:
+    """
+    A collection attribute holding an index that is created when first used.
+
+    Indexes are not fields of the collection, so they are not serialized and not compared,
+    and collections that are never looked up (e.g. partitions of snapshots) do not create them.
+    """
+
+    def __init__(self, name: str, many: bool = False, mutable: bool = False) -> None:
+        self._args = (name, many, mutable)
+
+    def __set_name__(self, owner: type, attribute: str) -> None:
+        self._attribute = attribute
+
+    def __get__(self, o: Any, cls: Optional[type] = None) -> Index:
+        if o is None:
+            return self
+
+        index = Index(*self._args)
+        o.__dict__[self._attribute] = index
+
+        return index
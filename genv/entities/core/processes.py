@@ -4,6 +4,9 @@ from typing import Iterable, Optional
 
 import genv.utils
 
+from .index import LazyIndex
+from .slots import slotted
+
 
 @dataclass
 class Process:
@@ -11,6 +14,7 @@ class Process:
     A compute running process.
     """
 
+    @slotted
     @dataclass
     class Usage:
         """
@@ -18,16 +22,22 @@ class Process:
         """
 
         index: int
-        gpu_memory: str
+        gpu_memory: genv.utils.Memory
+
+        def __post_init__(self) -> None:
+            self.gpu_memory = genv.utils.Memory(self.gpu_memory)
 
         @property
         def bytes(self) -> int:
-            return genv.utils.memory_to_bytes(self.gpu_memory)
+            return self.gpu_memory.bytes
 
     pid: int
     used_gpu_memory: Iterable[Usage]
     eid: Optional[str]
 
+    def __post_init__(self) -> None:
+        self.used_gpu_memory = tuple(self.used_gpu_memory)
+
     @property
     def indices(self) -> Iterable[int]:
         return [usage.index for usage in self.used_gpu_memory]
@@ -41,13 +51,17 @@ class Process:
 
     def filter(self, *, index: int):
         """
-        Returns a new process with information only of the given device index.
+        Returns a process with information only of the given device index.
+        Returns this process itself if it uses only this device.
         """
-        return Process(
-            self.pid,
-            [usage for usage in self.used_gpu_memory if usage.index == index],
-            self.eid,
-        )
+        used_gpu_memory = [
+            usage for usage in self.used_gpu_memory if usage.index == index
+        ]
+
+        if len(used_gpu_memory) == len(self.used_gpu_memory):
+            return self
+
+        return Process(self.pid, used_gpu_memory, self.eid)
 
     @staticmethod
     def eid(pid: int) -> Optional[str]:
@@ -56,13 +70,13 @@ class Process:
         Returns None if the process is not running in an environment or if it could not be queried.
         """
         try:
-            return genv.utils.get_process_environ(pid).get("GENV_ENVIRONMENT_ID")
+            return genv.utils.get_process_eid(pid)
         except PermissionError:
             print(
                 f"[WARNING] Not enough permissions to query environment of process {pid}",
                 file=sys.stderr,
             )
-        except FileNotFoundError:
+        except (FileNotFoundError, ProcessLookupError):
             print(f"[DEBUG] Process {pid} already terminated", file=sys.stderr)
 
 
@@ -74,6 +88,9 @@ class Processes:
 
     processes: Iterable[Process]
 
+    _pids = LazyIndex("pid")
+    _eids = LazyIndex("eid")
+
     @property
     def pids(self) -> Iterable[int]:
         return [process.pid for process in self.processes]
@@ -85,7 +102,15 @@ class Processes:
         return self.processes.__len__()
 
     def __getitem__(self, pid: int) -> Process:
-        return next(process for process in self.processes if process.pid == pid)
+        processes = self._pids.get(self.processes, pid)
+
+        if not processes:
+            raise KeyError(pid)
+
+        return processes[0]
+
+    def __contains__(self, pid: int) -> bool:
+        return self._pids.contains(self.processes, pid)
 
     def filter(
         self,
@@ -116,12 +141,13 @@ class Processes:
 
         processes = self.processes
 
+        if eids is not None:
+            processes = self._eids.select(self.processes, eids)
+
         if pids is not None:
+            pids = set(pids)
             processes = [process for process in processes if process.pid in pids]
 
-        if eids is not None:
-            processes = [process for process in processes if process.eid in eids]
-
         if index is not None:
             if deep:
                 processes = [process.filter(index=index) for process in processes]
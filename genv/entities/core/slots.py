@@ -0,0 +1,36 @@
+import dataclasses
+
+
+def slotted(cls):
+    """
+    Returns a dataclass whose fields are stored in '__slots__' instead of a per-instance '__dict__'.
+
+    This is what 'dataclass(slots=True)' does in Python 3.10 and later.
+    Must be applied above the 'dataclass' decorator.
+    """
+    names = tuple(field.name for field in dataclasses.fields(cls))
+
+    # defaults are removed from the class as they conflict with slots, but constructors keep them
+    d = {name: value for name, value in cls.__dict__.items() if name not in names}
+    d.pop("__dict__", None)
+    d.pop("__weakref__", None)
+    d["__slots__"] = names
+
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, d)
+    slotted_cls.__qualname__ = cls.__qualname__
+
+    # methods that use 'super()' without arguments refer to the class in a closure cell
+    for value in d.values():
+        if isinstance(value, (staticmethod, classmethod)):
+            value = value.__func__
+        elif isinstance(value, property):
+            value = value.fget
+
+        for name, cell in zip(
+            getattr(getattr(value, "__code__", None), "co_freevars", ()),
+            getattr(value, "__closure__", None) or (),
+        ):
+            if name == "__class__" and cell.cell_contents is cls:
+                cell.cell_contents = slotted_cls
+
+    return slotted_cls
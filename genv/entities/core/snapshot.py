@@ -1,7 +1,8 @@
-from dataclasses import dataclass
-from typing import Iterable, Optional
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
 
-from .devices import Devices
+from .devices import Device, Devices
 from .envs import Envs
 from .processes import Processes
 
@@ -12,6 +13,42 @@ class Snapshot:
     envs: Envs
     devices: Devices
 
+    # not serialized and not a constructor argument so that it does not affect the JSON format
+    _timings: Dict[str, float] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @classmethod
+    def _lazy(cls, **fields: Callable[[], Any]) -> "Snapshot":
+        """
+        Returns a snapshot whose fields are computed by the given functions only when first accessed.
+        Assigning a field before that replaces it without computing it.
+        """
+        snapshot = cls.__new__(cls)
+        snapshot._timings = {}
+        snapshot._pending = fields
+
+        return snapshot
+
+    def __getattr__(self, name: str) -> Any:
+        # this is called only for attributes that are not set, e.g. fields of lazy snapshots
+        pending = self.__dict__.get("_pending", {})
+
+        if name not in pending:
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'"
+            )
+
+        value = pending.pop(name)()
+        setattr(self, name, value)
+
+        return value
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Returns the durations in seconds of the stages of taking the snapshot if known."""
+        return self._timings
+
     def filter(
         self,
         deep: bool = True,
@@ -22,6 +59,9 @@ class Snapshot:
     ):
         """
         Returns a new filtered snapshot.
+        Entities are shared with this snapshot if they are kept as is. Devices are
+        copied when changed using methods of the filtered collection.
+        Processes and devices are filtered only when accessed.
 
         :param deep: Perform deep filtering
         :param eid: Environment identifier to keep
@@ -30,8 +70,61 @@ class Snapshot:
         """
         envs = self.envs.filter(deep=deep, eid=eid, eids=eids, username=username)
 
-        return Snapshot(
-            processes=self.processes.filter(deep=deep, eids=envs.eids),
-            envs=envs,
-            devices=self.devices.filter(deep=deep, eids=envs.eids),
+        snapshot = Snapshot._lazy(
+            processes=lambda: self.processes.filter(deep=deep, eids=envs.eids),
+            devices=lambda: self.devices.filter(deep=deep, eids=envs.eids),
         )
+        snapshot.envs = envs
+
+        return snapshot
+
+    def group_by(self, field: str) -> Dict[str, "Snapshot"]:
+        """
+        Partitions the snapshot by environment identifier or username in a single pass.
+        The partition of every value is the same as deep filtering by it.
+        Entities are shared with this snapshot if they are kept as is. Devices are
+        copied when changed using methods of the partitions.
+
+        Environments without a username are not in any partition when grouping by username.
+
+        :param field: Either "eid" or "username"
+        """
+        if field not in ("eid", "username"):
+            raise ValueError(f"Can't group snapshots by '{field}'")
+
+        keys = {env.eid: getattr(env, field) for env in self.envs}
+
+        envs = defaultdict(list)
+        processes = defaultdict(list)
+        devices = defaultdict(list)
+
+        for env in self.envs:
+            if keys[env.eid]:
+                envs[keys[env.eid]].append(env)
+
+        for process in self.processes:
+            if keys.get(process.eid):
+                processes[keys[process.eid]].append(process)
+
+        for device in self.devices:
+            attachments = defaultdict(list)
+
+            for attachment in device.attachments:
+                if keys.get(attachment.eid):
+                    attachments[keys[attachment.eid]].append(attachment)
+
+            for key, kept in attachments.items():
+                devices[key].append(
+                    device
+                    if len(kept) == len(device.attachments)
+                    else Device(device.index, device.total_memory, kept)
+                )
+
+        return {
+            key: Snapshot(
+                processes=Processes(processes[key]),
+                envs=Envs(envs[key]),
+                devices=Devices._view(devices[key]),
+            )
+            for key in envs
+        }
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from typing import Iterable
 
+from genv.utils import Memory
+
 
 @dataclass
 class System:
@@ -19,8 +21,12 @@ class System:
         index: int
         utilization: int
         temperature: int
-        used_memory: str
-        total_memory: str
+        used_memory: Memory
+        total_memory: Memory
+
+        def __post_init__(self) -> None:
+            self.used_memory = Memory(self.used_memory)
+            self.total_memory = Memory(self.total_memory)
 
     genv: Genv
     devices: Iterable[Device]
@@ -0,0 +1,53 @@
+# number of changes made to tracked entities after their creation
+_changes = 0
+
+
+def changes() -> int:
+    """
+    Returns the number of changes made to tracked entities after their creation.
+    Data derived from entities (e.g. indexes of collections) is stale if this changed.
+    """
+    return _changes
+
+
+class Tracked:
+    """
+    An entity that tracks whether it was changed.
+
+    Assigning a field marks the entity as dirty. Methods that change fields in place
+    (e.g. appending to a list) should call '_touch()' explicitly.
+    """
+
+    __slots__ = ("_dirty",)
+
+    def __setattr__(self, name: str, value) -> None:
+        if name.startswith("_"):
+            super().__setattr__(name, value)
+            return
+
+        # fields are assigned for the first time when the entity is created
+        d = getattr(self, "__dict__", None)
+        created = name in d if d is not None else hasattr(self, name)
+
+        super().__setattr__(name, value)
+
+        if created:
+            self._touch()
+        else:
+            object.__setattr__(self, "_dirty", True)
+
+    def _touch(self) -> None:
+        """Marks the entity as dirty."""
+        global _changes
+
+        _changes += 1
+        object.__setattr__(self, "_dirty", True)
+
+    @property
+    def dirty(self) -> bool:
+        """Returns whether the entity was changed since it was marked as clean."""
+        return getattr(self, "_dirty", True)
+
+    def mark_clean(self) -> None:
+        """Marks the entity as clean."""
+        object.__setattr__(self, "_dirty", False)
@@ -1,6 +1,8 @@
+import math
 from typing import Iterable, Optional
 
 from genv.entities import Snapshot, System
+from genv.utils.statistics import Statistics
 
 from .metric import Metric
 from .spec import Spec
@@ -81,6 +83,21 @@ class Collection:
             self._process(snapshot, labels)
             self._user(snapshot, labels)
 
+    def update_statistics(self, statistics: Statistics, labels: dict = {}) -> None:
+        """
+        Updates metrics from the saved statistics of all processes.
+        """
+        for metric in self._find(Type.Lock):
+            for path, histogram in metric.spec.convert(statistics).items():
+                for le, count in histogram.cumulative():
+                    metric.labels(
+                        path=path, le="+Inf" if math.isinf(le) else str(le), **labels
+                    ).set(count)
+
+        for metric in self._find(Type.State):
+            for state, count in metric.spec.convert(statistics).items():
+                metric.labels(state=state, **labels).set(count)
+
     def _general(self, system: System, labels: dict) -> None:
         """Updates general metrics."""
 
@@ -113,8 +130,10 @@ class Collection:
         """
         Updates per-environment metrics.
         """
+        env_snapshots = snapshot.group_by("eid")
+
         for env in snapshot.envs:
-            env_snapshot = snapshot.filter(eid=env.eid)
+            env_snapshot = env_snapshots[env.eid]
 
             for metric in self._find(Type.Environment):
                 if not metric.spec.convert:
@@ -145,9 +164,7 @@ class Collection:
         """
         Updates per-user metrics.
         """
-        for username in snapshot.envs.usernames:
-            user_snapshot = snapshot.filter(username=username)
-
+        for username, user_snapshot in snapshot.group_by("username").items():
             for metric in self._find(Type.User):
                 if not metric.spec.convert:
                     continue
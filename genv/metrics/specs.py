@@ -1,8 +1,6 @@
 import inspect
 import sys
 
-from genv.utils import memory_to_bytes
-
 from .spec import Spec, Type
 
 
@@ -44,13 +42,13 @@ DEVICE_UTILIZATION = Device(
 DEVICE_MEMORY_USED = Device(
     "genv_device_memory_used_bytes",
     "Device used memory in bytes",
-    convert=lambda device: memory_to_bytes(device.used_memory),
+    convert=lambda device: device.used_memory.bytes,
 )
 
 DEVICE_MEMORY_TOTAL = Device(
     "genv_device_memory_total_bytes",
     "Device total memory in bytes",
-    convert=lambda device: memory_to_bytes(device.total_memory),
+    convert=lambda device: device.total_memory.bytes,
 )
 
 
@@ -97,7 +95,7 @@ def Environment(*args, **kwargs) -> Spec:
         *args,
         **kwargs,
         labelnames=("eid",) + labelnames,
-        filter=lambda labels, snapshot: labels[0] in snapshot.envs.eids,
+        filter=lambda labels, snapshot: labels[0] in snapshot.envs,
     )
 
 
@@ -125,7 +123,7 @@ def Process(*args, **kwargs) -> Spec:
         *args,
         **kwargs,
         labelnames=("pid", "eid") + labelnames,
-        filter=lambda labels, snapshot: int(labels[0]) in snapshot.processes.pids,
+        filter=lambda labels, snapshot: int(labels[0]) in snapshot.processes,
     )
 
 
@@ -175,6 +173,61 @@ USER_ATTACHED_DEVICES = User(
 )
 
 
+def Lock(*args, **kwargs) -> Spec:
+    """
+    Returns a per-lock metric specification of a histogram of durations of all processes.
+    Values are the amount of durations up to the label "le" in seconds.
+    """
+    labelnames = kwargs.pop("labelnames", tuple())
+
+    return Spec(
+        Type.Lock,
+        *args,
+        **kwargs,
+        labelnames=("path", "le") + labelnames,
+    )
+
+
+LOCK_WAIT = Lock(
+    "genv_lock_wait_seconds",
+    "Times processes waited for a lock",
+    convert=lambda statistics: statistics.histograms["lock_wait"],
+)
+
+LOCK_HOLD = Lock(
+    "genv_lock_hold_seconds",
+    "Times processes held a lock",
+    convert=lambda statistics: statistics.histograms["lock_hold"],
+)
+
+
+def State(*args, **kwargs) -> Spec:
+    """
+    Returns a per-state metric specification of a counter of all processes.
+    """
+    labelnames = kwargs.pop("labelnames", tuple())
+
+    return Spec(
+        Type.State,
+        *args,
+        **kwargs,
+        labelnames=("state",) + labelnames,
+    )
+
+
+STATE_WRITES_PERFORMED = State(
+    "genv_state_writes_performed_total",
+    "Number of times processes saved a state",
+    convert=lambda statistics: statistics.counters["state_writes_performed"],
+)
+
+STATE_WRITES_SKIPPED = State(
+    "genv_state_writes_skipped_total",
+    "Number of times processes skipped saving a state that was not changed",
+    convert=lambda statistics: statistics.counters["state_writes_skipped"],
+)
+
+
 ALL = [
     spec
     for _, spec in inspect.getmembers(
@@ -12,3 +12,5 @@ class Type(Enum):
     Environment = 2
     Process = 3
     User = 4
+    Lock = 5
+    State = 6
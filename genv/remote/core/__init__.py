@@ -1,4 +1,4 @@
-from .snapshot import snapshot
+from .snapshot import snapshot, system_and_snapshot
 from . import devices
 from . import envs
 from . import processes
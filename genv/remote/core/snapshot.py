@@ -1,7 +1,7 @@
 import json
 from typing import Iterable, Optional, Tuple
 
-from genv.entities import Snapshot
+from genv.entities import Snapshot, System
 from genv.serialization import JSONDecoder
 
 from ..utils import run, Host, Config, Command
@@ -9,12 +9,17 @@ from ..utils import run, Host, Config, Command
 # TODO(raz): should we support cases where 'sudo' is not an option?
 
 
-async def exec(config: Config, *, type: Optional[str], sudo: bool):
+async def exec(
+    config: Config, *, type: Optional[str], sudo: bool, system: bool = False
+):
     args = ["usage", "snapshot"]
 
     if type:
         args.append(f"--type {type}")
 
+    if system:
+        args.append("--system")
+
     command = Command(args, sudo)
 
     hosts, stdouts = await run(config, command)
@@ -29,3 +34,22 @@ async def snapshot(config: Config) -> Tuple[Iterable[Host], Iterable[Snapshot]]:
     :return: Returns the hosts that succeeded and their snapshots
     """
     return await exec(config, type=None, sudo=True)
+
+
+async def system_and_snapshot(
+    config: Config,
+) -> Tuple[Iterable[Host], Iterable[System], Iterable[Snapshot]]:
+    """
+    Queries system information and takes usage snapshots on multiple hosts.
+    Devices are queried once on every host for both.
+    Requires Genv to be installed on the hosts.
+
+    :return: Returns the hosts that succeeded and their system information and snapshots
+    """
+    hosts, outputs = await exec(config, type=None, sudo=True, system=True)
+
+    return (
+        hosts,
+        [output["system"] for output in outputs],
+        [output["snapshot"] for output in outputs],
+    )
@@ -31,11 +31,13 @@ class Config:
     :param hosts: Host configurations
     :param throw_on_error: Raise 'RuntimeError' if failing to connect to any host
     :param quiet: Ignore SSH errors
+    :param timeout: Maximum time in seconds for commands to run on every host
     """
 
     hosts: Iterable[Host]
     throw_on_error: bool
     quiet: bool
+    timeout: Optional[float] = None
 
 
 @dataclass
@@ -76,11 +78,19 @@ async def run(
     :return: Returns the hosts that succeeded and their standard outputs
     """
 
-    runners = [Runner(host.hostname, host.username, host.timeout) for host in config.hosts]
+    runners = [
+        Runner(host.hostname, host.username, host.timeout) for host in config.hosts
+    ]
 
     results = await asyncio.gather(
         *(
-            runner.run(*command.all_args, stdin=stdin, sudo=command.sudo, check=False)
+            runner.run(
+                *command.all_args,
+                stdin=stdin,
+                sudo=command.sudo,
+                check=False,
+                timeout=config.timeout,
+            )
             for runner, stdin in zip(runners, stdins or [None for _ in runners])
         )
     )
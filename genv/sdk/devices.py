@@ -44,6 +44,7 @@ def attach(
     index: Optional[int] = None,
     gpus: Optional[int] = None,
     allow_over_subscription: bool = False,
+    policy: Optional[str] = None,
 ) -> Iterable[int]:
     """Attaches devices to the current environment.
 
@@ -52,6 +53,8 @@ def attach(
     Otherwise, the device count is taken from the environment configuration.
 
     Does not detach devices if already attached to more devices.
+
+    :param policy: Name of the allocation policy choosing devices (e.g. "best-fit"); "GENV_ALLOCATION_POLICY" is used if not specified
     """
 
     if index is not None and gpus is not None:
@@ -72,12 +75,13 @@ def attach(
     else:
         kwargs["gpus"] = config.gpus
 
-    with genv.utils.global_lock():
+    with genv.core.devices.attachment_lock():
         indices = genv.core.devices.attach(
             env.eid(),
             **kwargs,
             gpu_memory=config.gpu_memory,
             allow_over_subscription=allow_over_subscription,
+            policy=policy,
         )
 
     _update_env(indices)
@@ -117,7 +121,7 @@ def detach(index: Optional[int] = None) -> Iterable[int]:
     if not env.active():
         raise RuntimeError("Not running in an active environment")
 
-    with genv.utils.global_lock():
+    with genv.core.devices.attachment_lock():
         indices = genv.core.devices.detach(env.eid(), index)
 
     _update_env(indices)
@@ -134,8 +138,7 @@ def refresh_attached() -> Iterable[int]:
     if not env.active():
         raise RuntimeError("Not running in an active environment")
 
-    with genv.utils.global_lock():
-        indices = genv.core.devices.attached(env.eid())
+    indices = genv.core.devices.attached(env.eid())
 
     _update_env(indices)
 
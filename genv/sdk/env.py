@@ -87,8 +87,7 @@ def refresh_configuration() -> Env.Config:
     if not active():
         raise RuntimeError("Not running in an active environment")
 
-    with genv.utils.global_lock():
-        config = genv.core.envs.configuration(eid())
+    config = genv.core.envs.configuration(eid())
 
     _update_env(config)
 
@@ -153,20 +152,25 @@ def activate(*, eid: Optional[str] = None, config: Optional[Env.Config] = None)
         set_temp_env_var("GENV_PYTHON", "1")
         set_temp_env_var("GENV_ENVIRONMENT_ID", eid)
 
-        with genv.utils.global_lock():
-            genv.core.envs.activate(
+        with genv.utils.global_lock(), genv.core.transaction() as transaction:
+            transaction.activate(
                 eid, uid=os.getuid(), username=getpass.getuser(), pid=pid
             )
 
-        if config is not None:
-            configure(config)
-        else:
-            config = refresh_configuration()
+            if config is not None:
+                transaction.configure(eid, config)
+            else:
+                config = transaction.envs[eid].config
+
+            indices = transaction.attached(eid)
 
-        indices = devices.refresh_attached()
+            if not indices:
+                indices = transaction.attach(
+                    eid, gpus=config.gpus, gpu_memory=config.gpu_memory
+                )
 
-        if not indices:
-            devices.attach()
+        _update_env(config)
+        devices._update_env(indices)
 
         try:
             yield
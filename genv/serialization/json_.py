@@ -1,7 +1,19 @@
+import dataclasses
 import json
 from typing import Any, Dict
 
-from genv.entities import Device, Devices, Env, Envs, Process, Processes, Snapshot, Report
+from genv.entities import (
+    Device,
+    Devices,
+    Env,
+    Envs,
+    Process,
+    Processes,
+    Snapshot,
+    System,
+    Report,
+)
+from genv.utils import Timestamp
 
 # TODO(raz): test here that all types have a different set of keys for creation
 Types = [
@@ -16,16 +28,33 @@ Types = [
     Processes,
     Report,
     Snapshot,
+    System,
+    System.Device,
+    System.Genv,
 ]
 
 
 class JSONEncoder(json.JSONEncoder):
     def default(self, o: Any) -> Dict:
         if o.__class__ in Types:
-            return o.__dict__
+            # private attributes (e.g. change tracking) are not serialized.
+            # fields are used rather than '__dict__' as some types use slots.
+            return {
+                field.name: self._encode(getattr(o, field.name))
+                for field in dataclasses.fields(o)
+                if not field.name.startswith("_")
+            }
 
         return super().default(o)
 
+    @staticmethod
+    def _encode(value: Any) -> Any:
+        # timestamps are serialized as strings and not as numbers for compatibility
+        if isinstance(value, Timestamp):
+            return str(value)
+
+        return value
+
 
 class JSONDecoder(json.JSONDecoder):
     def __init__(self) -> None:
@@ -1,5 +1,10 @@
+from .histogram import Histogram
 from .os_ import *
 from .poll import *
+from .proc import *
 from .utils import *
 from . import runners
 from . import nvidia_smi
+from . import drivers
+from . import watch
+from . import statistics
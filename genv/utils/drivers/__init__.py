@@ -0,0 +1,5 @@
+from .driver import Driver, Query, get, use
+from .cli import Driver as CLI
+from .fake import Driver as Fake
+from .nvml import Driver as NVML
+from .sampler import Driver as Sampler
@@ -0,0 +1,29 @@
+from typing import Dict, Iterable
+
+from .. import nvidia_smi
+from ..runners import Runner
+
+from .driver import Driver as Base
+
+
+class Driver(Base):
+    """
+    Queries devices by running "nvidia-smi".
+    """
+
+    _runner: Runner
+
+    def __init__(self, runner: Runner = nvidia_smi.DEFAULT_LOCAL_RUNNER):
+        self._runner = runner
+
+    async def device_uuids(self) -> Dict[str, int]:
+        return await nvidia_smi.device_uuids(self._runner)
+
+    async def compute_apps(self) -> Iterable[Dict]:
+        return await nvidia_smi.compute_apps(self._runner)
+
+    async def devices(self) -> Iterable[Dict]:
+        return await nvidia_smi.devices(self._runner)
+
+    def total_memory(self) -> Iterable[str]:
+        return nvidia_smi.total_memory()
@@ -0,0 +1,124 @@
+from abc import ABC, abstractmethod
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass
+import functools
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+
+@dataclass
+class Query:
+    """
+    Devices and compute apps that were queried together.
+    """
+
+    devices: Iterable[Dict]
+    apps: Iterable[Dict]
+
+    @property
+    def uuids(self) -> Dict[str, int]:
+        """Returns a mapping from device UUID to its index."""
+        return {device["uuid"]: device["index"] for device in self.devices}
+
+
+class Driver(ABC):
+    """
+    Queries devices and the compute processes running on them.
+
+    Memory amounts are returned in MiB as strings with an "mi" suffix, similar to the
+    output of "nvidia-smi".
+    """
+
+    @abstractmethod
+    async def device_uuids(self) -> Dict[str, int]:
+        """
+        Queries device UUIDs.
+
+        :return: A mapping from device UUID to its index
+        """
+        raise NotImplementedError("This should be implemented in subclasses")
+
+    @abstractmethod
+    async def compute_apps(self) -> Iterable[Dict]:
+        """
+        Queries the running compute apps.
+
+        :return: Dictionaries with the keys 'gpu_uuid', 'pid' and 'used_gpu_memory'
+        """
+        raise NotImplementedError("This should be implemented in subclasses")
+
+    @abstractmethod
+    async def devices(self) -> Iterable[Dict]:
+        """
+        Queries the UUID, utilization, temperature and memory of devices.
+
+        :return: Dictionaries with the keys 'index', 'uuid', 'utilization', 'temperature', 'used_memory' and 'total_memory'
+        """
+        raise NotImplementedError("This should be implemented in subclasses")
+
+    async def query(self) -> Query:
+        """
+        Queries everything about devices and compute apps at once.
+
+        This is meant for callers that need both system information and a snapshot,
+        so that devices are queried once rather than once per consumer.
+        """
+        devices, apps = await asyncio.gather(self.devices(), self.compute_apps())
+
+        return Query(devices, apps)
+
+    @abstractmethod
+    def total_memory(self) -> Iterable[str]:
+        """
+        Queries the total memory of devices ordered by their index.
+        This is a blocking call for callers without an event loop.
+        """
+        raise NotImplementedError("This should be implemented in subclasses")
+
+
+# driver that is used instead of the default one if set
+_driver: Optional[Driver] = None
+
+
+def get() -> Driver:
+    """
+    Returns the driver of this process.
+
+    The driver is selected using the environment variable 'GENV_DRIVER'.
+    By default, "nvidia-smi" is used and NVML is used only if requested explicitly.
+    The driver is created once so that it can reuse device handles across calls.
+    """
+    return _driver or _create()
+
+
+@contextmanager
+def use(driver: Driver) -> Iterator[Driver]:
+    """Uses a driver instead of the default one in this process."""
+    global _driver
+
+    prev = _driver
+    _driver = driver
+
+    try:
+        yield driver
+    finally:
+        _driver = prev
+
+
+@functools.lru_cache(maxsize=None)
+def _create() -> Driver:
+    from .cli import Driver as CLI
+    from .fake import Driver as Fake
+    from .nvml import Driver as NVML
+
+    name = os.environ.get("GENV_DRIVER", "nvidia-smi")
+
+    if name == "nvidia-smi":
+        return CLI()
+    elif name == "nvml":
+        return NVML()
+    elif name == "fake":
+        return Fake()
+    else:
+        raise RuntimeError(f"Unknown driver '{name}'")
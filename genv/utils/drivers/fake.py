@@ -0,0 +1,69 @@
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from ..utils import memory_to_memory
+
+from .driver import Driver as Base
+
+
+def _default(value: Optional[Any], name: str, default: str) -> str:
+    return str(value) if value is not None else os.environ.get(name, default)
+
+
+class Driver(Base):
+    """
+    Fake devices for testing and benchmarking on machines without GPUs.
+
+    Defaults are taken from the environment variables of the "nvidia-smi" mock shim.
+    Compute apps are added by appending dictionaries to 'apps'.
+    """
+
+    def __init__(
+        self,
+        device_count: Optional[int] = None,
+        total_memory: Optional[str] = None,
+        used_memory: Optional[str] = None,
+        utilization: Optional[int] = None,
+        temperature: Optional[int] = None,
+    ):
+        self._device_count = int(_default(device_count, "GENV_MOCK_DEVICE_COUNT", "2"))
+        self._total_memory = memory_to_memory(
+            _default(total_memory, "GENV_MOCK_DEVICE_TOTAL_MEMORY", "16g"), "mi"
+        )
+        self._used_memory = memory_to_memory(
+            _default(used_memory, "GENV_MOCK_DEVICE_USED_MEMORY", "10mi"), "mi"
+        )
+        self._utilization = int(
+            _default(utilization, "GENV_MOCK_DEVICE_UTILIZATION", "93")
+        )
+        self._temperature = int(
+            _default(temperature, "GENV_MOCK_DEVICE_TEMPERATURE", "38")
+        )
+        self.apps = []
+
+    @staticmethod
+    def uuid(index: int) -> str:
+        """Returns the UUID of a fake device."""
+        return f"GPU-00000000-0000-0000-0000-{index:012}"
+
+    async def device_uuids(self) -> Dict[str, int]:
+        return {self.uuid(index): index for index in range(self._device_count)}
+
+    async def compute_apps(self) -> Iterable[Dict]:
+        return list(self.apps)
+
+    async def devices(self) -> Iterable[Dict]:
+        return [
+            dict(
+                index=index,
+                uuid=self.uuid(index),
+                utilization=self._utilization,
+                temperature=self._temperature,
+                used_memory=self._used_memory,
+                total_memory=self._total_memory,
+            )
+            for index in range(self._device_count)
+        ]
+
+    def total_memory(self) -> Iterable[str]:
+        return [self._total_memory] * self._device_count
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any, Dict, Iterable
+
+from .driver import Driver as Base
+
+MIB = 1024 * 1024
+
+
+def _str(value: Any) -> str:
+    # older versions of 'pynvml' return bytes
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class Driver(Base):
+    """
+    Queries devices using NVML.
+
+    NVML is initialized once and device handles are reused across calls, which
+    avoids running a process and initializing the driver on every query.
+    NVML calls block, so they run in an executor rather than in the event loop.
+    Requires 'pynvml'.
+    """
+
+    def __init__(self):
+        import pynvml
+
+        pynvml.nvmlInit()
+
+        self._nvml = pynvml
+        self._handles = [
+            pynvml.nvmlDeviceGetHandleByIndex(index)
+            for index in range(pynvml.nvmlDeviceGetCount())
+        ]
+        self._uuids = [
+            _str(pynvml.nvmlDeviceGetUUID(handle)) for handle in self._handles
+        ]
+
+    async def device_uuids(self) -> Dict[str, int]:
+        return {uuid: index for index, uuid in enumerate(self._uuids)}
+
+    async def compute_apps(self) -> Iterable[Dict]:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._compute_apps
+        )
+
+    def _compute_apps(self) -> Iterable[Dict]:
+        apps = []
+
+        for uuid, handle in zip(self._uuids, self._handles):
+            for process in self._nvml.nvmlDeviceGetComputeRunningProcesses(handle):
+                apps.append(
+                    dict(
+                        gpu_uuid=uuid,
+                        pid=process.pid,
+                        used_gpu_memory=f"{(process.usedGpuMemory or 0) // MIB}mi",
+                    )
+                )
+
+        return apps
+
+    async def devices(self) -> Iterable[Dict]:
+        return await asyncio.get_running_loop().run_in_executor(None, self._devices)
+
+    def _devices(self) -> Iterable[Dict]:
+        devices = []
+
+        for index, (uuid, handle) in enumerate(zip(self._uuids, self._handles)):
+            memory = self._nvml.nvmlDeviceGetMemoryInfo(handle)
+
+            devices.append(
+                dict(
+                    index=index,
+                    uuid=uuid,
+                    utilization=self._nvml.nvmlDeviceGetUtilizationRates(handle).gpu,
+                    temperature=self._nvml.nvmlDeviceGetTemperature(
+                        handle, self._nvml.NVML_TEMPERATURE_GPU
+                    ),
+                    used_memory=f"{memory.used // MIB}mi",
+                    total_memory=f"{memory.total // MIB}mi",
+                )
+            )
+
+        return devices
+
+    def total_memory(self) -> Iterable[str]:
+        return [
+            f"{self._nvml.nvmlDeviceGetMemoryInfo(handle).total // MIB}mi"
+            for handle in self._handles
+        ]
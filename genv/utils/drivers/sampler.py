@@ -0,0 +1,288 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+import math
+import sys
+import time
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
+
+from .. import nvidia_smi
+
+from .cli import Driver as CLI
+from .driver import Driver as Base
+
+# maximum time in seconds to wait before restarting "nvidia-smi" after it failed
+MAX_RESTART_DELAY = 30
+
+
+@dataclass
+class Sample:
+    """
+    Rows that "nvidia-smi" printed in a single iteration.
+
+    :param time: Time at which the rows were printed
+    """
+
+    time: float
+    rows: Iterable[Dict]
+
+
+class Stream:
+    """
+    A query that "nvidia-smi" runs in loop mode.
+
+    "nvidia-smi" prints all rows of an iteration at once, so rows that arrive together
+    form a sample. Recent samples are kept in a ring buffer.
+    "nvidia-smi" is restarted if it exits or prints unexpected output.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        parse: Callable[[str], Dict],
+        key: Callable[[Dict], Any],
+        interval: float,
+        size: int,
+        empty: bool,
+    ) -> None:
+        """
+        :param query: Query parameter
+        :param parse: Parses a row
+        :param key: Returns a key that is unique among the rows of a single iteration
+        :param interval: Sampling interval in seconds
+        :param size: Number of samples to keep
+        :param empty: Whether iterations can have no rows, in which case nothing is printed
+        """
+        self._args = [
+            nvidia_smi.NVIDIA_SMI,
+            query,
+            nvidia_smi.CSV_FORMAT_PARAM,
+            f"--loop-ms={max(1, int(interval * 1000))}",
+        ]
+        self._parse = parse
+        self._key = key
+        self._interval = interval
+        self._empty = empty
+        self._task: Optional[asyncio.Task] = None
+        self.samples: Deque[Sample] = deque(maxlen=size)
+        self.restarts = 0
+
+    @property
+    def latest(self) -> Optional[Sample]:
+        """Returns the latest sample if any."""
+        return self.samples[-1] if self.samples else None
+
+    @property
+    def staleness(self) -> float:
+        """Returns the time in seconds since the latest sample."""
+        return time.time() - self.latest.time if self.samples else math.inf
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        self._task.cancel()
+
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        delay = self._interval
+
+        while True:
+            started = time.monotonic()
+            error = None
+
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *self._args,
+                    env=nvidia_smi.DEFAULT_NVIDIA_SMI_ENV_VARS,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+            except OSError as e:
+                error = str(e)
+            else:
+                try:
+                    await self._read(process.stdout)
+                except ValueError as e:
+                    error = f"unexpected output ({e})"
+                finally:
+                    if process.returncode is None:
+                        process.kill()
+
+                    await process.wait()
+
+                error = error or f"exited with code {process.returncode}"
+
+            # restart quickly after long runs and back off after repeated failures
+            if time.monotonic() - started > MAX_RESTART_DELAY:
+                delay = self._interval
+            else:
+                delay = min(delay * 2, MAX_RESTART_DELAY)
+
+            self.restarts += 1
+
+            print(
+                f"[WARNING] '{' '.join(self._args)}' {error}; restarting in {delay:g} seconds",
+                file=sys.stderr,
+            )
+
+            await asyncio.sleep(delay)
+
+    async def _read(self, stdout: asyncio.StreamReader) -> None:
+        rows = []
+        keys = set()
+        first = None
+
+        def flush():
+            nonlocal rows, keys
+
+            self.samples.append(Sample(first or time.time(), rows))
+            rows, keys = [], set()
+
+        while True:
+            # a short silence ends an iteration and a long one means it had no rows
+            timeout = self._interval / 2 if rows else self._interval * 1.5
+
+            try:
+                line = await asyncio.wait_for(stdout.readline(), timeout)
+            except asyncio.TimeoutError:
+                if rows or self._empty:
+                    flush()
+                    first = None
+
+                continue
+
+            if not line:
+                return  # "nvidia-smi" exited
+
+            line = line.decode("utf-8").strip()
+
+            if not line:
+                continue
+
+            row = self._parse(line)
+            key = self._key(row)
+
+            # iterations can follow each other without a silence if sampling is fast
+            if key in keys:
+                flush()
+
+            if not rows:
+                first = time.time()
+
+            rows.append(row)
+            keys.add(key)
+
+
+class Driver(Base):
+    """
+    Samples devices and compute apps by keeping "nvidia-smi" running in loop mode.
+
+    Queries return the latest samples without running any process.
+    If there is no recent sample (e.g. right after starting or while "nvidia-smi"
+    is being restarted), queries run "nvidia-smi" instead.
+
+    Must be used as an asynchronous context manager.
+    """
+
+    def __init__(self, interval: float, size: int = 100) -> None:
+        """
+        :param interval: Sampling interval in seconds
+        :param size: Number of samples to keep per query
+        """
+        self._interval = interval
+        self._fallback = CLI()
+        self._devices = Stream(
+            nvidia_smi.DEVICES_QUERY_PARAM,
+            nvidia_smi.parse_device,
+            lambda device: device["index"],
+            interval,
+            size,
+            empty=False,
+        )
+        self._apps = Stream(
+            nvidia_smi.COMPUTE_APPS_QUERY_PARAM,
+            nvidia_smi.parse_compute_app,
+            lambda app: (app["gpu_uuid"], app["pid"]),
+            interval,
+            size,
+            empty=True,
+        )
+
+    @property
+    def max_staleness(self) -> float:
+        """Returns the maximum age in seconds of samples that are used."""
+        return 3 * self._interval + 1
+
+    @property
+    def staleness(self) -> float:
+        """Returns the time in seconds since the oldest of the latest samples."""
+        return max(self._devices.staleness, self._apps.staleness)
+
+    @property
+    def device_samples(self) -> Iterable[Sample]:
+        """Returns recent device samples from oldest to latest."""
+        return list(self._devices.samples)
+
+    @property
+    def compute_app_samples(self) -> Iterable[Sample]:
+        """Returns recent compute app samples from oldest to latest."""
+        return list(self._apps.samples)
+
+    def _recent(self, stream: Stream) -> Optional[Sample]:
+        """Returns the latest sample of a stream if it is recent enough."""
+        if stream.staleness <= self.max_staleness:
+            return stream.latest
+
+        if stream.samples:
+            print(
+                f"[WARNING] Latest device sample is {stream.staleness:.1f} seconds old; querying directly",
+                file=sys.stderr,
+            )
+
+        return None
+
+    async def device_uuids(self) -> Dict[str, int]:
+        return {device["uuid"]: device["index"] for device in await self.devices()}
+
+    async def compute_apps(self) -> Iterable[Dict]:
+        sample = self._recent(self._apps)
+
+        if sample is None:
+            return await self._fallback.compute_apps()
+
+        return sample.rows
+
+    async def devices(self) -> Iterable[Dict]:
+        sample = self._recent(self._devices)
+
+        if sample is None:
+            return await self._fallback.devices()
+
+        return sample.rows
+
+    def total_memory(self) -> Iterable[str]:
+        sample = self._recent(self._devices)
+
+        if sample is None:
+            return self._fallback.total_memory()
+
+        return [
+            device["total_memory"]
+            for device in sorted(sample.rows, key=lambda device: device["index"])
+        ]
+
+    async def __aenter__(self) -> "Driver":
+        self._devices.start()
+        self._apps.start()
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self._devices.close()
+        await self._apps.close()
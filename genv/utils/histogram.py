@@ -0,0 +1,51 @@
+import bisect
+import math
+from typing import Any, Dict, Iterable, Tuple
+
+
+class Histogram:
+    """
+    A histogram of durations in seconds.
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, math.inf)
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Records a duration."""
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterable[Tuple[float, int]]:
+        """Returns the amount of durations up to every bucket upper bound."""
+        total = 0
+
+        for bound, count in zip(self.BUCKETS, self.counts):
+            total += count
+
+            yield bound, total
+
+    def update(self, other: "Histogram") -> None:
+        """Adds the durations of another histogram."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"counts": self.counts, "sum": self.sum}
+
+    @classmethod
+    def from_json(cls, o: Dict[str, Any]) -> "Histogram":
+        histogram = cls()
+
+        if len(o["counts"]) == len(cls.BUCKETS):
+            histogram.counts = list(o["counts"])
+            histogram.count = sum(histogram.counts)
+            histogram.sum = o["sum"]
+
+        return histogram
@@ -1,7 +1,14 @@
+from contextlib import contextmanager
+import json
 import os
-from typing import Dict, Iterable
+from pathlib import Path
+import subprocess
+import time
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional
 
+from .os_ import Umask
 from .runners import Runner, Local
+from .utils import get_temp_file_path, replace_file
 
 DEFAULT_NVIDIA_SMI_ENV_VARS = {"GENV_BYPASS": "1", **os.environ}
 DEFAULT_LOCAL_RUNNER = Local(DEFAULT_NVIDIA_SMI_ENV_VARS)
@@ -9,6 +16,144 @@ DEFAULT_LOCAL_RUNNER = Local(DEFAULT_NVIDIA_SMI_ENV_VARS)
 NVIDIA_SMI = "nvidia-smi"
 CSV_FORMAT_PARAM = "--format=csv,noheader,nounits"
 NVIDIA_CSV_SPLITTER = ", "
+COMPUTE_APPS_QUERY_PARAM = "--query-compute-apps=gpu_uuid,pid,used_gpu_memory"
+DEVICES_QUERY_PARAM = (
+    "--query-gpu=index,uuid,utilization.gpu,temperature.gpu,memory.used,memory.total"
+)
+
+
+def _timeout() -> Optional[float]:
+    """Returns the maximum time in seconds for queries to run, or None for no limit."""
+    timeout = float(os.environ.get("GENV_NVIDIA_SMI_TIMEOUT", 60))
+
+    return timeout if timeout > 0 else None
+
+
+def _cache_ttl() -> float:
+    """Returns the time in seconds for which query results are shared between processes."""
+    return float(os.environ.get("GENV_NVIDIA_SMI_CACHE_TTL", 1))
+
+
+def _boot_id() -> Optional[str]:
+    """Returns an identifier of the current boot if available."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+# whether results that change are queried rather than taken from the cache
+_fresh = False
+
+
+@contextmanager
+def fresh() -> Iterator[None]:
+    """
+    Queries information that changes (e.g. compute apps) instead of using results of
+    other processes in this process. Results are still shared with other processes.
+    """
+    global _fresh
+
+    prev = _fresh
+    _fresh = True
+
+    try:
+        yield
+    finally:
+        _fresh = prev
+
+
+def _cache_path(name: str) -> str:
+    return get_temp_file_path(os.path.join("cache", f"nvidia-smi.{name}.json"))
+
+
+def _load_cached(name: str, static: bool) -> Optional[str]:
+    """
+    Returns the cached output of a query if still valid.
+
+    Static results are valid for the entire boot and other results expire after the cache TTL.
+    Only results that were written by this user or by root are trusted.
+    Results that change are not used while querying fresh results.
+    """
+    ttl = _cache_ttl()
+
+    if ttl <= 0 or (_fresh and not static):
+        return None
+
+    try:
+        with open(_cache_path(name)) as f:
+            if os.fstat(f.fileno()).st_uid not in [os.getuid(), 0]:
+                return None
+
+            entry = json.load(f)
+
+        stdout = entry["stdout"]
+
+        if not isinstance(stdout, str):
+            return None
+
+        if static and entry["boot_id"] is not None and entry["boot_id"] == _boot_id():
+            return stdout
+
+        if 0 <= time.time() - entry["time"] < ttl:
+            return stdout
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # the entry is invalid and the results are queried again
+
+    return None
+
+
+def _store_cached(name: str, stdout: str) -> None:
+    """Caches the output of a query for other processes."""
+    if _cache_ttl() <= 0:
+        return
+
+    path = _cache_path(name)
+    entry = dict(boot_id=_boot_id(), time=time.time(), stdout=stdout)
+
+    try:
+        with Umask(0):
+            Path(path).parent.mkdir(parents=True, exist_ok=True, mode=0o777)
+
+        # other users can read but not modify the results
+        replace_file(path, json.dumps(entry), mode=0o644)
+    except OSError:
+        pass  # caching is best effort
+
+
+async def _query(
+    runner: Runner, name: str, *args: str, static: bool = False
+) -> AsyncIterator[str]:
+    """
+    Runs "nvidia-smi" and yields its output lines as they are printed.
+    Results of the default local runner are shared between processes for a short time.
+
+    :param name: Cache entry name
+    :param static: Whether the results do not change until the next boot
+    """
+    cached = runner is DEFAULT_LOCAL_RUNNER
+
+    if cached:
+        stdout = _load_cached(name, static)
+
+        if stdout is not None:
+            for line in stdout.splitlines():
+                yield line
+
+            return
+
+    lines = []
+
+    async for line in runner.stream(NVIDIA_SMI, *args, check=True, timeout=_timeout()):
+        line = line.strip()
+
+        if line:
+            lines.append(line)
+            yield line
+
+    if cached:
+        _store_cached(name, "\n".join(lines))
 
 
 async def device_uuids(runner: Runner = DEFAULT_LOCAL_RUNNER) -> Dict[str, int]:
@@ -17,11 +162,11 @@ async def device_uuids(runner: Runner = DEFAULT_LOCAL_RUNNER) -> Dict[str, int]:
 
     :return: A mapping from device UUID to its index
     """
-    stdout = (await runner.run(NVIDIA_SMI, "--query-gpu=uuid,index", CSV_FORMAT_PARAM, check=True)).stdout
-
     mapping = dict()
 
-    for line in stdout.splitlines():
+    async for line in _query(
+        runner, "uuids", "--query-gpu=uuid,index", CSV_FORMAT_PARAM, static=True
+    ):
         uuid, index = line.split(NVIDIA_CSV_SPLITTER)
         mapping[uuid] = int(index)
 
@@ -32,23 +177,64 @@ async def compute_apps(runner: Runner = DEFAULT_LOCAL_RUNNER) -> Iterable[Dict]:
     """
     Queries the running compute apps.
     """
-    output = (
-        await runner.run(
-            NVIDIA_SMI,
-            "--query-compute-apps=gpu_uuid,pid,used_gpu_memory",
-            CSV_FORMAT_PARAM,
-            check=True)
-    ).stdout
+    return [
+        parse_compute_app(line)
+        async for line in _query(
+            runner, "apps", COMPUTE_APPS_QUERY_PARAM, CSV_FORMAT_PARAM
+        )
+    ]
+
+
+def parse_compute_app(line: str) -> Dict:
+    """Parses an output line of a compute apps query."""
+    gpu_uuid, pid, used_gpu_memory = line.split(NVIDIA_CSV_SPLITTER)
 
-    apps = []
+    return dict(gpu_uuid=gpu_uuid, pid=int(pid), used_gpu_memory=f"{used_gpu_memory}mi")
 
-    for line in output.splitlines():
-        gpu_uuid, pid, used_gpu_memory = line.split(NVIDIA_CSV_SPLITTER)
 
-        apps.append(
-            dict(
-                gpu_uuid=gpu_uuid, pid=int(pid), used_gpu_memory=f"{used_gpu_memory}mi"
-            )
+async def devices(runner: Runner = DEFAULT_LOCAL_RUNNER) -> Iterable[Dict]:
+    """
+    Queries the UUID, utilization, temperature and memory of devices.
+    """
+    return [
+        parse_device(line)
+        async for line in _query(
+            runner, "devices", DEVICES_QUERY_PARAM, CSV_FORMAT_PARAM
         )
+    ]
+
+
+def parse_device(line: str) -> Dict:
+    """Parses an output line of a devices query."""
+    index, uuid, utilization, temperature, used_memory, total_memory = line.split(
+        NVIDIA_CSV_SPLITTER
+    )
+
+    return dict(
+        index=int(index),
+        uuid=uuid,
+        utilization=int(utilization),
+        temperature=int(temperature),
+        used_memory=f"{used_memory}mi",
+        total_memory=f"{total_memory}mi",
+    )
+
+
+def total_memory() -> Iterable[str]:
+    """
+    Queries the total memory of devices ordered by their index.
+    This is a blocking call for callers without an event loop.
+    """
+    output = _load_cached("total_memory", static=True)
+
+    if output is None:
+        output = subprocess.check_output(
+            [NVIDIA_SMI, "--query-gpu=memory.total", CSV_FORMAT_PARAM],
+            env=DEFAULT_NVIDIA_SMI_ENV_VARS,
+            text=True,
+            timeout=_timeout(),
+        ).strip()
+
+        _store_cached("total_memory", output)
 
-    return apps
+    return [f"{int(line)}mi" for line in output.splitlines()]
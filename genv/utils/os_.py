@@ -1,14 +1,20 @@
-from contextlib import contextmanager
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
 import fcntl
+import json
 import os
 from pathlib import Path
 import platform
 import signal
-import subprocess
-from typing import Dict, Iterable
+import sys
+import time
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional
 
 import psutil
 
+from . import statistics
+
 
 @contextmanager
 def Umask(value: int = 0):
@@ -20,36 +26,185 @@ def Umask(value: int = 0):
 
 
 class Flock:
-    def __init__(self, path: str, mode: int):
+    def __init__(
+        self,
+        path: str,
+        mode: int,
+        shared: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        """
+        :param shared: Lock a shared lock that can be held by many processes at once instead of an exclusive one
+        :param timeout: Maximum time in seconds to wait for the lock; waits forever if not passed
+        """
         self._path = path
         self._mode = mode
+        self._shared = shared
+        self._timeout = timeout
 
     def __enter__(self):
-        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, self._mode)
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, self._mode)
+
+        start = time.monotonic()
+
+        try:
+            if self._timeout is None:
+                fcntl.flock(self._fd, fcntl.LOCK_SH if self._shared else fcntl.LOCK_EX)
+            else:
+                for delay in self._poll(start):
+                    time.sleep(delay)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+        self._locked(start)
+
+    async def __aenter__(self):
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, self._mode)
+
+        start = time.monotonic()
 
+        # the lock is always polled so that the event loop is not blocked and
+        # so that waiting can be cancelled
         try:
-            fcntl.flock(self._fd, fcntl.LOCK_EX)
-        except (IOError, OSError):
+            for delay in self._poll(start):
+                await asyncio.sleep(delay)
+        except BaseException:
             os.close(self._fd)
             raise
 
+        self._locked(start)
+
+    def _locked(self, start: float) -> None:
+        self._acquired = time.monotonic()
+
+        statistics.observe("lock_wait", self._path, self._acquired - start)
+
+        if not self._shared:
+            self._set_holder(
+                {
+                    "pid": os.getpid(),
+                    "command": " ".join(sys.argv),
+                    "time": datetime.now().isoformat(timespec="seconds"),
+                }
+            )
+
+    def _poll(self, start: float) -> Iterator[float]:
+        """
+        Tries to lock without blocking until succeeding.
+        Yields the time in seconds to wait before every next try.
+        """
+        operation = fcntl.LOCK_SH if self._shared else fcntl.LOCK_EX
+
+        delay = 0.001
+
+        while True:
+            try:
+                fcntl.flock(self._fd, operation | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                pass
+
+            if self._timeout is None:
+                yield delay
+            else:
+                remaining = start + self._timeout - time.monotonic()
+
+                if remaining <= 0:
+                    raise RuntimeError(
+                        f"Timed out after {self._timeout:g} seconds waiting for lock {self._path}{_describe(lock_holder(self._path))}"
+                    )
+
+                yield min(delay, remaining)
+
+            delay = min(delay * 2, 0.1)
+
+    def _set_holder(self, holder: Optional[dict]) -> None:
+        """Records the holder of the lock in a sidecar file; best effort."""
+        try:
+            fd = os.open(
+                f"{self._path}.holder", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666
+            )
+
+            try:
+                if holder:
+                    os.write(fd, json.dumps(holder).encode("utf-8"))
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.__exit__(exc_type, exc_val, exc_tb)
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         try:
+            if not self._shared:
+                self._set_holder(None)
+
+            statistics.observe(
+                "lock_hold", self._path, time.monotonic() - self._acquired
+            )
+
             fcntl.flock(self._fd, fcntl.LOCK_UN)
         finally:
             os.close(self._fd)
 
 
+def _describe(holder: Optional[dict]) -> str:
+    """Returns a description of a lock holder for error messages."""
+    if holder is None:
+        return ""
+
+    return f"; held by process {holder['pid']} ({holder['command']}) since {holder['time']}"
+
+
+def lock_holder(path: str) -> Optional[dict]:
+    """
+    Returns the process holding an exclusive lock (pid, command and time) or None if not held.
+    The holder may no longer run if it did not exit gracefully.
+    """
+    try:
+        with open(f"{path}.holder") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return None
+
+    try:
+        return json.loads(content) if content else None
+    except ValueError:
+        return None  # being written
+
+
 @contextmanager
-def access_lock(path: str) -> None:
+def access_lock(
+    path: str, shared: bool = False, timeout: Optional[float] = None
+) -> None:
     """
-    Locks an exclusive lock.
+    Locks an exclusive lock, or a shared lock if requested.
     Creates the lock file and its parent directories if not exists.
+
+    Raises 'RuntimeError' if a timeout is passed and the lock was not locked in time.
+    """
+    with Umask(0):
+        Path(path).parent.mkdir(parents=True, exist_ok=True, mode=0o777)
+
+        with Flock(path, mode=0o666, shared=shared, timeout=timeout):
+            yield
+
+
+@asynccontextmanager
+async def aaccess_lock(
+    path: str, shared: bool = False, timeout: Optional[float] = None
+) -> AsyncIterator[None]:
+    """
+    An asynchronous variant of access_lock() that does not block the event loop.
+    Waiting for the lock can be cancelled.
     """
     with Umask(0):
         Path(path).parent.mkdir(parents=True, exist_ok=True, mode=0o777)
 
-        with Flock(path, mode=0o666):
+        async with Flock(path, mode=0o666, shared=shared, timeout=timeout):
             yield
 
 
@@ -85,6 +240,28 @@ def get_process_environ(pid: int) -> Dict[str, str]:
         }
 
 
+def get_process_start_time(pid: int) -> Optional[float]:
+    """
+    Returns the start time of the process with the given identifier or None if no such process.
+    Together with the process identifier, it identifies a process even if its identifier is reused.
+    """
+    if platform.system() == "Linux":
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                stat = f.read()
+        except (FileNotFoundError, ProcessLookupError):
+            return None
+
+        # the process name is in parentheses and can contain spaces so we split after it.
+        # the start time is the 22nd field and is measured in clock ticks since boot.
+        return float(stat.rsplit(")", 1)[1].split()[19])
+
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.NoSuchProcess:
+        return None
+
+
 def get_process_listen_ports(pid: int) -> Iterable[int]:
     """Returns the port number on which a process listens."""
 
@@ -99,29 +276,6 @@ def get_process_listen_ports(pid: int) -> Iterable[int]:
     return [connection.laddr.port for connection in connections]
 
 
-def pgrep(name: str) -> Iterable[int]:
-    """
-    Returns the identifiers of processes with the given name.
-    """
-    return [
-        int(pid)
-        for pid in subprocess.check_output(
-            f"pgrep {name} || true", shell=True
-        ).splitlines()
-    ]
-
-
-def cmdline(pid: int) -> Iterable[str]:
-    """
-    Returns the cmdline of the process with the given identifier.
-    """
-    return (
-        subprocess.check_output(f"tr '\\0' ' ' </proc/{pid}/cmdline", shell=True)
-        .decode("utf-8")
-        .split()
-    )
-
-
 def terminate(pid: int) -> None:
     """
     Terminates the running process with the given pid by sending the signal SIGTERM to it.
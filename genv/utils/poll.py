@@ -1,4 +1,5 @@
 import errno
+import functools
 import os
 import subprocess
 
@@ -22,6 +23,21 @@ def poll_pid(pid: int) -> bool:
         return True
 
 
+@functools.lru_cache(maxsize=None)
+def _jupyter_runtime_dir() -> str:
+    """Returns the Jupyter runtime directory. Queried only once per process."""
+    try:
+        result = subprocess.run(
+            ["jupyter", "--runtime-dir"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        return ""
+
+    return result.stdout.decode("utf-8").strip() if result.returncode == 0 else ""
+
+
 def poll_jupyter_kernel(kernel_id: str) -> bool:
     # TODO(raz): what about the case when 'jupyter' is not available in the
     #            environment that we are currently running in?
@@ -31,10 +47,4 @@ def poll_jupyter_kernel(kernel_id: str) -> bool:
     # should we document the kernel json path when activating a kernel, so that the path will
     # be known in other environments as well? what if we don't have read permissions?
 
-    result = subprocess.run(
-        ["sh", "-c", f"ls $(jupyter --runtime-dir)/kernel-{kernel_id}.json"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-
-    return result.returncode == 0
+    return os.path.exists(f"{_jupyter_runtime_dir()}/kernel-{kernel_id}.json")
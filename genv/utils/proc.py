@@ -0,0 +1,129 @@
+import os
+import platform
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+import psutil
+
+from .os_ import get_process_start_time
+
+# size in bytes of reads from the proc filesystem
+CHUNK_SIZE = 4096
+
+# maximum number of cached environment identifiers before entries of terminated processes are dropped
+MAX_CACHED_EIDS = 4096
+
+# environment identifiers by process identifier and start time
+_eids: Dict[Tuple[int, float], Optional[str]] = {}
+
+
+def get_process_environ_variable(pid: int, name: str) -> Optional[str]:
+    """
+    Returns the value of an environment variable of the process with the given identifier,
+    or None if it is not set.
+    Stops reading the environment of the process once the variable is found.
+
+    Raises 'NotImplementedError' if running in a non-Linux platform as it relies on the Linux proc filesystem.
+    Raises 'FileNotFoundError' if no such process.
+    Raises 'PermissionError' if there is no sufficient permissions.
+    """
+    if platform.system() != "Linux":
+        raise NotImplementedError(
+            "genv.utils.proc.get_process_environ_variable is not supported in platforms other than Linux"
+        )
+
+    prefix = f"{name}=".encode("utf-8")
+
+    with open(f"/proc/{pid}/environ", "rb") as f:
+        partial = b""
+
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            variables = (partial + chunk).split(b"\x00")
+
+            # the last variable could continue in the next chunk
+            partial = variables.pop() if chunk else b""
+
+            for variable in variables:
+                if variable.startswith(prefix):
+                    return variable[len(prefix) :].decode("utf-8", errors="replace")
+
+            if not chunk:
+                return None
+
+
+def get_process_eid(pid: int) -> Optional[str]:
+    """
+    Returns the environment identifier of the process with the given identifier,
+    or None if it is not running in an environment.
+
+    Results are cached by the process identifier and start time, so that the environment
+    of every process is read once even if process identifiers are reused.
+
+    Raises 'FileNotFoundError' or 'ProcessLookupError' if no such process.
+    Raises 'PermissionError' if there is no sufficient permissions.
+    """
+    start_time = get_process_start_time(pid)
+
+    if start_time is None:
+        raise ProcessLookupError(f"No such process {pid}")
+
+    key = (pid, start_time)
+
+    if key not in _eids:
+        if len(_eids) >= MAX_CACHED_EIDS:
+            for pid_, start_time_ in list(_eids.keys()):
+                if get_process_start_time(pid_) != start_time_:
+                    del _eids[(pid_, start_time_)]
+
+        # the start time is read again so that a process that was replaced meanwhile is not cached
+        eid = get_process_environ_variable(pid, "GENV_ENVIRONMENT_ID")
+
+        if get_process_start_time(pid) != start_time:
+            raise ProcessLookupError(f"No such process {pid}")
+
+        _eids[key] = eid
+
+    return _eids[key]
+
+
+def pgrep(name: str) -> Iterable[int]:
+    """
+    Returns the identifiers of processes whose name matches the given pattern.
+    """
+    pattern = re.compile(name)
+
+    if platform.system() != "Linux":
+        return [
+            process.pid
+            for process in psutil.process_iter(["name"])
+            if process.info["name"] and pattern.search(process.info["name"])
+        ]
+
+    pids = []
+
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit() or int(entry.name) == os.getpid():
+            continue
+
+        try:
+            with open(f"/proc/{entry.name}/comm", "rb") as f:
+                comm = f.read().rstrip(b"\n").decode("utf-8", errors="replace")
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+
+        if pattern.search(comm):
+            pids.append(int(entry.name))
+
+    return sorted(pids)
+
+
+def cmdline(pid: int) -> Iterable[str]:
+    """
+    Returns the cmdline of the process with the given identifier.
+    """
+    if platform.system() != "Linux":
+        return " ".join(psutil.Process(pid).cmdline()).split()
+
+    with open(f"/proc/{pid}/cmdline", "rb") as f:
+        return f.read().decode("utf-8", errors="replace").replace("\x00", " ").split()
@@ -1,10 +1,23 @@
 import asyncio
 from asyncio.subprocess import Process
+import os
 
 from .runner import Runner as Base
 
 
 class Runner(Base):
+    """
+    Runs commands locally.
+
+    Commands run in their own session, so their process group includes all of their
+    descendants that did not change it, and the entire group is signaled when a
+    command is killed. This way processes that cannot be killed directly (e.g. when
+    using sudo) could pass the signal on.
+    """
+
+    def _signal(self, process: Process, sig: int) -> None:
+        os.killpg(process.pid, sig)
+
     async def _open_process(self, *args: str, stdin_fd: int, sudo: bool) -> Process:
         if sudo:
             args = ["sudo", *args]
@@ -15,4 +28,5 @@ class Runner(Base):
             stdin=stdin_fd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
         )
@@ -1,7 +1,11 @@
 import asyncio
 from abc import ABC, abstractmethod
 from asyncio.subprocess import Process
-from typing import Dict, Optional
+import signal
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+# time in seconds that processes get to exit after being terminated before they are killed
+KILL_GRACE_PERIOD = 1
 
 
 class CommandResults:
@@ -27,26 +31,144 @@ class Runner(ABC):
         stdin: Optional[str] = None,
         sudo: bool = False,
         check: bool = False,
+        timeout: Optional[float] = None,
     ) -> CommandResults:
+        """
+        Runs a command and waits for it to finish.
+
+        :param timeout: Maximum time in seconds for the command to run; its process tree is killed afterwards
+        """
         stdin_fd = asyncio.subprocess.PIPE if stdin else asyncio.subprocess.DEVNULL
         process = await self._open_process(*args, stdin_fd=stdin_fd, sudo=sudo)
 
-        stdout, stderr = await process.communicate(
-            stdin.encode("utf-8") if stdin else None
-        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(stdin.encode("utf-8") if stdin else None),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            stdout, stderr = b"", f"Timed out after {timeout} seconds".encode("utf-8")
+        finally:
+            if process.returncode is None:
+                await self._kill(process)
 
         stdout = stdout.decode("utf-8").strip()
         stderr = stderr.decode("utf-8").strip()
 
         if check and process.returncode != 0:
-            command = " ".join(args)
-            stdin_str = " with stdin " + str(stdin)
-            raise RuntimeError(
-                f"Failed running '{command}' {' with sudo ' if sudo else ''} { stdin_str if stdin else '' } ({stderr})"
-            )
+            self._raise(args, stdin, sudo, stderr)
 
         return CommandResults(process, stdout, stderr)
 
+    async def stream(
+        self,
+        *args: str,
+        stdin: Optional[str] = None,
+        sudo: bool = False,
+        check: bool = False,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Runs a command and yields its output lines as they are printed.
+        Raises 'RuntimeError' after the last line if 'check' is set and the command failed.
+
+        :param timeout: Maximum time in seconds for the command to run; its process tree is killed afterwards
+        """
+        stdin_fd = asyncio.subprocess.PIPE if stdin else asyncio.subprocess.DEVNULL
+        process = await self._open_process(*args, stdin_fd=stdin_fd, sudo=sudo)
+
+        if stdin:
+            process.stdin.write(stdin.encode("utf-8"))
+            process.stdin.close()
+
+        # standard error is read concurrently so that the process does not block on it
+        stderr = asyncio.ensure_future(process.stderr.read())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        timed_out = False
+
+        def remaining() -> Optional[float]:
+            return max(0, deadline - loop.time()) if deadline is not None else None
+
+        try:
+            while True:
+                line = await asyncio.wait_for(process.stdout.readline(), remaining())
+
+                if not line:
+                    break
+
+                yield line.decode("utf-8").rstrip("\r\n")
+
+            await asyncio.wait_for(process.wait(), remaining())
+        except asyncio.TimeoutError:
+            timed_out = True
+        except BaseException:
+            stderr.cancel()
+            raise
+        finally:
+            if process.returncode is None:
+                await self._kill(process)
+
+        if timed_out:
+            stderr.cancel()
+            errors = f"Timed out after {timeout} seconds"
+        else:
+            errors = (await stderr).decode("utf-8").strip()
+
+        if check and (timed_out or process.returncode != 0):
+            self._raise(args, stdin, sudo, errors)
+
+    def _raise(
+        self, args: Iterable[str], stdin: Optional[str], sudo: bool, stderr: str
+    ) -> None:
+        command = " ".join(args)
+        stdin_str = " with stdin " + str(stdin)
+        raise RuntimeError(
+            f"Failed running '{command}' {' with sudo ' if sudo else ''} { stdin_str if stdin else '' } ({stderr})"
+        )
+
+    def _signal(self, process: Process, sig: int) -> None:
+        """
+        Sends a signal to a process that should be killed.
+
+        Raises 'ProcessLookupError' if no such process.
+        Raises 'PermissionError' if there is no sufficient permissions.
+        """
+        process.send_signal(sig)
+
+    async def _kill(self, process: Process) -> None:
+        """
+        Kills a process, first by terminating it and then by killing it if it did not exit.
+
+        Raises 'RuntimeError' if the process did not exit after being killed, e.g. if
+        it runs as another user.
+        """
+        try:
+            self._signal(process, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+        try:
+            await asyncio.wait_for(process.wait(), KILL_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            pass
+
+        try:
+            self._signal(process, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            try:
+                process.kill()
+            except (ProcessLookupError, PermissionError):
+                pass
+
+        try:
+            await asyncio.wait_for(process.wait(), KILL_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Could not kill process {process.pid}")
+
     @abstractmethod
     async def _open_process(self, *args: str, stdin_fd: int, sudo: bool) -> Process:
+        """
+        Starts a process.
+        """
         raise NotImplementedError("This should be implemented in subclasses")
@@ -6,6 +6,13 @@ from .runner import Runner as Base
 
 
 class Runner(Base):
+    """
+    Runs commands on a remote host using ssh.
+
+    Only the ssh process is killed when a command is killed. The remote command is
+    hung up when the connection is closed.
+    """
+
     hostname: str
     username: Optional[str]
     timeout: Optional[int]
@@ -0,0 +1,85 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict
+
+from .histogram import Histogram
+
+
+class Statistics:
+    """
+    Histograms and counters by name and key.
+    """
+
+    def __init__(self) -> None:
+        self.histograms: Dict[str, Dict[str, Histogram]] = defaultdict(
+            lambda: defaultdict(Histogram)
+        )
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(Counter)
+
+    def __bool__(self) -> bool:
+        return bool(self.histograms or self.counters)
+
+    def observe(self, name: str, key: str, value: float) -> None:
+        """Records a duration in a histogram."""
+        self.histograms[name][key].observe(value)
+
+    def increment(self, name: str, key: str, amount: int = 1) -> None:
+        """Increments a counter."""
+        self.counters[name][key] += amount
+
+    def update(self, other: "Statistics") -> None:
+        """Adds other statistics to these ones."""
+        for name, histograms in other.histograms.items():
+            for key, histogram in histograms.items():
+                self.histograms[name][key].update(histogram)
+
+        for name, counters in other.counters.items():
+            self.counters[name].update(counters)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "histograms": {
+                name: {
+                    key: histogram.to_json() for key, histogram in histograms.items()
+                }
+                for name, histograms in self.histograms.items()
+            },
+            "counters": {
+                name: dict(counters) for name, counters in self.counters.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, o: Dict[str, Any]) -> "Statistics":
+        statistics = cls()
+
+        for name, histograms in o.get("histograms", {}).items():
+            for key, histogram in histograms.items():
+                statistics.histograms[name][key] = Histogram.from_json(histogram)
+
+        for name, counters in o.get("counters", {}).items():
+            statistics.counters[name].update(counters)
+
+        return statistics
+
+
+# statistics of this process that were not saved yet
+_pending = Statistics()
+
+
+def observe(name: str, key: str, value: float) -> None:
+    """Records a duration in a histogram of this process."""
+    _pending.observe(name, key, value)
+
+
+def increment(name: str, key: str, amount: int = 1) -> None:
+    """Increments a counter of this process."""
+    _pending.increment(name, key, amount)
+
+
+def pop() -> Statistics:
+    """Returns the statistics of this process that were not saved yet and forgets them."""
+    global _pending
+
+    statistics, _pending = _pending, Statistics()
+
+    return statistics
@@ -1,10 +1,15 @@
-from contextlib import contextmanager
+import atexit
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
 import json
 import os
-from typing import Any, Callable, Optional, Type, TypeVar, Union
+import shutil
+import tempfile
+import time
+from typing import Any, AsyncIterator, Callable, Optional, Type, TypeVar, Union
 
-from .os_ import Umask, access_lock
+from . import statistics
+from .os_ import aaccess_lock, access_lock, Umask
 
 T = TypeVar("T")
 
@@ -63,23 +68,202 @@ def save_state(
 ):
     """
     Saves a state file.
+
+    The state file is replaced atomically so readers never see a partially written state.
     """
-    with Umask(0):
-        with open(
-            path, "w", opener=lambda path, flags: os.open(path, flags, 0o666)
-        ) as f:
-            json.dump(o, f, cls=json_encoder, indent=2)
+    replace_file(path, json.dumps(o, cls=json_encoder, indent=2))
+
+
+def replace_file(path: str, contents: str, mode: int = 0o666) -> None:
+    """
+    Replaces the contents of a file atomically by writing a temporary file and renaming it.
+    The file is created with read and write permissions for all users by default.
+    """
+    fd, temp = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}."
+    )
+
+    try:
+        with os.fdopen(fd, "w") as f:
+            os.fchmod(f.fileno(), mode)
+            f.write(contents)
+
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def get_generation(path: str) -> int:
+    """
+    Returns the generation of a state file.
+    The generation is incremented every time a new version of the state is published.
+    """
+    try:
+        with open(f"{path}.generation") as f:
+            return int(f.read() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def bump_generation(path: str) -> int:
+    """
+    Increments the generation of a state file.
+    Should be called while holding the global lock.
+
+    :return: The new generation
+    """
+    generation = get_generation(path) + 1
+
+    replace_file(f"{path}.generation", str(generation))
+
+    return generation
+
+
+class Memory(str):
+    """
+    An immutable memory quantity.
+
+    This is a memory string (e.g. "4g" or "1024mi") that is parsed once when its bytes
+    are first used, so that it is serialized as is while arithmetic uses its bytes.
+    Arithmetic and ordering accept memory quantities and integers, which are in bytes.
+    Results of arithmetic are in bytes.
+
+    Being a string, it is equal to and hashed like its text, and is concatenated with
+    other strings. Use equals() or compare the bytes to compare amounts of memory
+    written in different units for equality.
+    Values that cannot be parsed (e.g. "[N/A]") raise 'ValueError' only when their
+    bytes are used.
+    """
+
+    def __new__(cls, value: Union[str, int, "Memory"]) -> "Memory":
+        if isinstance(value, Memory):
+            return value
+
+        o = super().__new__(cls, str(value))
+
+        if isinstance(value, int):
+            object.__setattr__(o, "_bytes", value)
+
+        return o
+
+    def __reduce__(self):
+        return Memory, (str(self),)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"'{self.__class__.__name__}' is immutable")
+
+    @property
+    def bytes(self) -> int:
+        """
+        Returns the amount of bytes.
+        Raises 'ValueError' if the memory string is invalid.
+        """
+        try:
+            return self._bytes
+        except AttributeError:
+            pass
+
+        bytes = None
+
+        for unit, multiplier in MEMORY_TO_BYTES_MULTIPLIERS_DICT.items():
+            if self.endswith(unit):
+                bytes = int(self.replace(unit, "")) * multiplier
+                break
+
+        # the value is already in bytes if no unit was specified
+        if bytes is None:
+            bytes = int(self)
+
+        object.__setattr__(self, "_bytes", bytes)
+
+        return bytes
+
+    def to(self, unit: str, suffix: bool = True) -> str:
+        """Returns a memory string in the given unit."""
+        return bytes_to_memory(self.bytes, unit=unit, suffix=suffix)
+
+    def equals(self, other: Union[str, int, "Memory"]) -> bool:
+        """Returns whether another memory quantity has the same amount of bytes."""
+        return self.bytes == Memory(other).bytes
+
+    @staticmethod
+    def _other(other: Any) -> Optional[int]:
+        """Returns the bytes of another operand or None if not supported."""
+        if isinstance(other, Memory):
+            return other.bytes
+
+        if isinstance(other, int):
+            return other
+
+        return None
+
+    def __repr__(self) -> str:
+        return f"Memory({str.__repr__(self)})"
+
+    def __add__(self, other: Any) -> Union["Memory", str]:
+        if isinstance(other, str) and not isinstance(other, Memory):
+            return str.__add__(self, other)
+
+        other = Memory._other(other)
+
+        return NotImplemented if other is None else Memory(self.bytes + other)
+
+    def __radd__(self, other: Any) -> "Memory":
+        other = Memory._other(other)
+
+        return NotImplemented if other is None else Memory(other + self.bytes)
+
+    def __sub__(self, other: Any) -> "Memory":
+        other = Memory._other(other)
+
+        return NotImplemented if other is None else Memory(self.bytes - other)
+
+    def __rsub__(self, other: Any) -> "Memory":
+        other = Memory._other(other)
+
+        return NotImplemented if other is None else Memory(other - self.bytes)
+
+    def __mul__(self, other: Any) -> "Memory":
+        if not isinstance(other, int):
+            return NotImplemented
+
+        return Memory(self.bytes * other)
+
+    __rmul__ = __mul__
+
+    def _compare(self, other: Any) -> int:
+        """
+        Returns the bytes of another operand to compare to.
+        Raises 'TypeError' if it is not supported, rather than comparing strings.
+        """
+        bytes = Memory._other(other)
+
+        if bytes is None:
+            raise TypeError(
+                f"'{self.__class__.__name__}' cannot be compared to '{type(other).__name__}'"
+            )
+
+        return bytes
+
+    def __lt__(self, other: Any) -> bool:
+        return self.bytes < self._compare(other)
+
+    def __le__(self, other: Any) -> bool:
+        return self.bytes <= self._compare(other)
+
+    def __gt__(self, other: Any) -> bool:
+        return self.bytes > self._compare(other)
+
+    def __ge__(self, other: Any) -> bool:
+        return self.bytes >= self._compare(other)
 
 
 def memory_to_bytes(cap: str) -> int:
     """
     Convert memory string to an integer value in bytes.
     """
-    for unit, multiplier in MEMORY_TO_BYTES_MULTIPLIERS_DICT.items():
-        if cap.endswith(unit):
-            return int(cap.replace(unit, "")) * multiplier
-
-    return int(cap)  # the value is already in bytes if no unit was specified
+    return Memory(cap).bytes
 
 
 # TODO(raz): support detecting the most suitable units automatically
@@ -102,16 +286,58 @@ def memory_to_memory(memory: str, unit: str, suffix: bool = True) -> str:
     return bytes_to_memory(bytes=memory_to_bytes(memory), unit=unit, suffix=suffix)
 
 
-def time_since(dt: Union[str, datetime]) -> str:
+class Timestamp(float):
+    """
+    A point in time in seconds since the epoch.
+
+    Timestamps are created from numbers, datetime objects or strings in 'DATETIME_FMT'
+    which are parsed once. They are printed and serialized as such strings.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, value: Union[str, float, datetime]) -> "Timestamp":
+        if isinstance(value, Timestamp):
+            return value
+
+        if isinstance(value, str):
+            value = datetime.strptime(value, DATETIME_FMT)
+
+        if isinstance(value, datetime):
+            value = value.timestamp()
+
+        return super().__new__(cls, value)
+
+    @classmethod
+    def now(cls) -> "Timestamp":
+        """Returns the current time in a resolution of seconds like 'DATETIME_FMT'."""
+        return cls(datetime.now().replace(microsecond=0))
+
+    @property
+    def datetime(self) -> datetime:
+        """Returns the timestamp as a local datetime object."""
+        return datetime.fromtimestamp(self)
+
+    def __reduce__(self):
+        return Timestamp, (float(self),)
+
+    def __str__(self) -> str:
+        return self.datetime.strftime(DATETIME_FMT)
+
+    def __repr__(self) -> str:
+        return f"Timestamp('{self}')"
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+
+def time_since(dt: Union[str, datetime, Timestamp]) -> str:
     """
     This function returns a human readable string describing the amount of time passed since 'dt'
-    :param dt: The base time to calculate from. Can be either string or datetime
+    :param dt: The base time to calculate from. Can be either string, datetime or timestamp
     :return: a human readable string describing the amount of time passed since 'dt'
     """
-    if isinstance(dt, str):
-        dt = datetime.strptime(dt, DATETIME_FMT)
-
-    value = int((datetime.now() - dt).total_seconds())
+    value = int(time.time() - Timestamp(dt))
     unit = "second"
 
     for amount, next_units in [
@@ -132,10 +358,123 @@ def time_since(dt: Union[str, datetime]) -> str:
     return f"{value} {unit} ago"
 
 
+def get_lock_timeout() -> Optional[float]:
+    """
+    Returns the maximum time in seconds to wait for Genv locks; None means waiting forever.
+    Locks are waited for forever by default.
+    """
+    timeout = float(os.environ.get("GENV_LOCK_TIMEOUT", 0))
+
+    return timeout if timeout > 0 else None
+
+
 @contextmanager
-def global_lock() -> None:
+def global_lock(shared: bool = False) -> None:
     """
     Locks the global lock.
+    Raises 'RuntimeError' if a lock timeout is set and the lock was not locked within it.
+
+    :param shared: Lock in shared mode; for code that only reads state and does not save it
     """
-    with access_lock(get_temp_file_path("genv.lock")):
+    with access_lock(
+        get_temp_file_path("genv.lock"), shared=shared, timeout=get_lock_timeout()
+    ):
         yield
+
+
+@asynccontextmanager
+async def aglobal_lock(
+    shared: bool = False, timeout: Optional[float] = None
+) -> AsyncIterator[None]:
+    """
+    Locks the global lock without blocking the event loop.
+    Waiting for the lock can be cancelled.
+    Raises 'RuntimeError' if the lock was not locked in time.
+
+    :param shared: Lock in shared mode; for code that only reads state and does not save it
+    :param timeout: Maximum time in seconds to wait; the lock timeout is used if not passed
+    """
+    async with aaccess_lock(
+        get_temp_file_path("genv.lock"),
+        shared=shared,
+        timeout=timeout if timeout is not None else get_lock_timeout(),
+    ):
+        yield
+
+
+def _get_statistics_dir() -> str:
+    return get_temp_file_path("statistics")
+
+
+def enable_statistics() -> None:
+    """
+    Makes processes save the statistics they record so that they could be collected.
+    """
+    with Umask(0):
+        os.makedirs(_get_statistics_dir(), mode=0o777, exist_ok=True)
+
+
+def disable_statistics() -> None:
+    """
+    Stops processes from saving the statistics they record and removes saved statistics.
+    """
+    shutil.rmtree(_get_statistics_dir(), ignore_errors=True)
+
+
+def save_statistics() -> None:
+    """
+    Saves the statistics recorded by this process if statistics are enabled.
+    This is called when the process exits so that short-lived processes are accounted for.
+    Every process saves to a file of its own so that processes never wait for each other.
+    """
+    pending = statistics.pop()
+
+    if not pending:
+        return
+
+    directory = _get_statistics_dir()
+
+    if not os.path.isdir(directory):
+        return  # statistics are not enabled
+
+    try:
+        replace_file(
+            os.path.join(directory, f"{os.getpid()}.{time.time_ns()}.json"),
+            json.dumps(pending.to_json()),
+        )
+    except OSError:
+        pass  # statistics were disabled meanwhile
+
+
+def collect_statistics() -> statistics.Statistics:
+    """
+    Returns the statistics that processes saved since they were last collected, and removes them.
+    """
+    collected = statistics.Statistics()
+
+    try:
+        names = os.listdir(_get_statistics_dir())
+    except FileNotFoundError:
+        return collected
+
+    for name in names:
+        if name.startswith("."):
+            continue  # being written
+
+        path = os.path.join(_get_statistics_dir(), name)
+
+        try:
+            with open(path) as f:
+                collected.update(statistics.Statistics.from_json(json.load(f)))
+        except (FileNotFoundError, ValueError):
+            pass
+
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    return collected
+
+
+atexit.register(save_statistics)
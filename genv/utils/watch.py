@@ -0,0 +1,195 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from typing import Iterable, Optional, Set
+
+from .poll import poll_pid
+
+# interval in seconds between polls of processes that could not be watched
+POLL_INTERVAL = 0.5
+
+# https://man7.org/linux/man-pages/man7/inotify.7.html
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+
+
+class DirectoryWatcher:
+    """
+    Watches a directory for changes in its files using inotify.
+
+    Raises 'OSError' if inotify is not supported.
+    """
+
+    def __init__(self, path: str) -> None:
+        if not hasattr(os, "O_CLOEXEC"):
+            raise OSError("inotify is not supported")
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            raise OSError("inotify is not supported")
+
+        self._fd = inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        if (
+            inotify_add_watch(
+                self._fd,
+                os.fsencode(path),
+                IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE,
+            )
+            < 0
+        ):
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, os.strerror(errno), path)
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def drain(self) -> None:
+        """Discards all pending events."""
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class ProcessWatcher:
+    """
+    Waits for processes to exit.
+
+    Uses pidfds where supported (Linux 5.3 and Python 3.9 or newer) and polls
+    processes otherwise.
+    """
+
+    def __init__(self, directory: Optional[DirectoryWatcher] = None) -> None:
+        """
+        :param directory: Optional directory watcher to also wait on
+        """
+        self._epoll = select.epoll() if hasattr(select, "epoll") else None
+        self._directory = directory
+        self._fds = {}  # pid -> pidfd
+        self._pids = {}  # pidfd -> pid
+        self._polled: Set[int] = set()
+        self._exited: Set[int] = set()
+
+        if self._epoll and self._directory:
+            self._epoll.register(self._directory.fileno(), select.EPOLLIN)
+
+    @property
+    def pids(self) -> Iterable[int]:
+        """Returns the watched processes."""
+        return [*self._fds.keys(), *self._polled, *self._exited]
+
+    def watch(self, pids: Iterable[int]) -> None:
+        """Watches exactly the given processes."""
+        pids = set(pids)
+
+        for pid in set(self.pids) - pids:
+            self._remove(pid)
+
+        for pid in pids - set(self.pids):
+            self._add(pid)
+
+    def _add(self, pid: int) -> None:
+        if self._epoll is None or not hasattr(os, "pidfd_open"):
+            self._polled.add(pid)
+            return
+
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            self._exited.add(pid)
+            return
+        except OSError:
+            self._polled.add(pid)
+            return
+
+        self._fds[pid] = fd
+        self._pids[fd] = pid
+        self._epoll.register(fd, select.EPOLLIN)
+
+    def _remove(self, pid: int) -> None:
+        if pid in self._fds:
+            fd = self._fds.pop(pid)
+            del self._pids[fd]
+            self._epoll.unregister(fd)
+            os.close(fd)
+
+        self._polled.discard(pid)
+        self._exited.discard(pid)
+
+    def wait(self, timeout: float) -> Iterable[int]:
+        """
+        Waits for watched processes to exit and returns them.
+        Exited processes are no longer watched.
+
+        Returns early with no processes if the optional directory watcher has changes.
+
+        :param timeout: Maximum time in seconds to wait
+        """
+        deadline = time.monotonic() + timeout
+
+        while True:
+            exited = self._wait(max(0, deadline - time.monotonic()))
+
+            if exited is not None:
+                for pid in exited:
+                    self._remove(pid)
+
+                return exited
+
+            if time.monotonic() >= deadline:
+                return []
+
+    def _wait(self, timeout: float) -> Optional[Iterable[int]]:
+        """Waits once; returns None if nothing happened."""
+        if self._exited:
+            return list(self._exited)
+
+        if self._polled:
+            timeout = min(timeout, POLL_INTERVAL)
+
+        exited = []
+        changed = False
+
+        if self._epoll is not None:
+            for fd, _ in self._epoll.poll(timeout):
+                if fd in self._pids:
+                    exited.append(self._pids[fd])
+                else:
+                    changed = True
+        else:
+            if self._directory:
+                changed = bool(select.select([self._directory], [], [], timeout)[0])
+            else:
+                time.sleep(timeout)
+
+        if changed:
+            self._directory.drain()
+
+        exited += [pid for pid in self._polled if not poll_pid(pid)]
+
+        return exited if exited or changed else None
+
+    def close(self) -> None:
+        for pid in list(self.pids):
+            self._remove(pid)
+
+        if self._epoll is not None:
+            self._epoll.close()
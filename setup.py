@@ -35,6 +35,7 @@ setuptools.setup(
         "admin": ["prometheus_client"],
         "dev": ["black"],
         "monitor": ["prometheus_client"],
+        "nvml": ["pynvml"],
         "ray": ["ray", "pynvml"],
     },
 )